@@ -21,38 +21,70 @@ from homeassistant.const import ATTR_DEVICE_ID
 from homeassistant.const import CONF_HOST
 from homeassistant.const import CONF_PASSWORD
 from homeassistant.const import CONF_USERNAME
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event
 from homeassistant.core import HomeAssistant
 from homeassistant.core import ServiceCall
+from homeassistant.core import callback
 from homeassistant.helpers import device_registry
 from homeassistant.helpers import entity_registry
 from homeassistant.helpers import restore_state
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
 import voluptuous as vol
 
+from .api import ENDPOINT_CLIENT_LIST
 from .api import TplinkDecoApi
 from .api import normalize_name
 from .const import ATTR_DEVICE_TYPE
+from .const import CLIENTS_SAVE_DELAY_SECONDS
+from .const import CLIENTS_STORAGE_KEY
+from .const import CLIENTS_STORAGE_VERSION
+from .const import CONF_ADAPTIVE_CLIENT_INTERVAL
+from .const import CONF_CLIENT_MAX_INTERVAL
+from .const import CONF_CLIENT_MIN_INTERVAL
 from .const import CONF_CLIENT_POSTFIX
 from .const import CONF_CLIENT_PREFIX
+from .const import CONF_CLIENT_QUERY_CONCURRENCY
+from .const import CONF_CLIENT_QUERY_SHARD_SIZE
+from .const import CONF_CLIENT_RETENTION_DAYS
 from .const import CONF_DECO_POSTFIX
 from .const import CONF_DECO_PREFIX
+from .const import CONF_DEVICE_LIST_INTERVAL
+from .const import CONF_HEDGE_REQUESTS
+from .const import CONF_MAX_CLIENTS
+from .const import CONF_PERFORMANCE_INTERVAL
 from .const import CONF_TIMEOUT_ERROR_RETRIES
 from .const import CONF_TIMEOUT_SECONDS
+from .const import CONF_TOP_CLIENTS_COUNT
 from .const import CONF_VERIFY_SSL
 from .const import COORDINATOR_CLIENTS_KEY
 from .const import COORDINATOR_DECOS_KEY
+from .const import DEFAULT_CLIENT_MAX_INTERVAL
+from .const import DEFAULT_CLIENT_MIN_INTERVAL
+from .const import DEFAULT_CLIENT_QUERY_CONCURRENCY
+from .const import DEFAULT_CLIENT_QUERY_SHARD_SIZE
+from .const import DEFAULT_CLIENT_RETENTION_DAYS
 from .const import DEFAULT_CONSIDER_HOME
 from .const import DEFAULT_DECO_POSTFIX
+from .const import DEFAULT_DEVICE_LIST_INTERVAL
+from .const import DEFAULT_MAX_CLIENTS
+from .const import DEFAULT_PERFORMANCE_INTERVAL
 from .const import DEFAULT_SCAN_INTERVAL
 from .const import DEFAULT_TIMEOUT_ERROR_RETRIES
 from .const import DEFAULT_TIMEOUT_SECONDS
+from .const import DEFAULT_TOP_CLIENTS_COUNT
 from .const import DEVICE_TYPE_DECO
 from .const import DOMAIN
 from .const import PLATFORMS
 from .const import SERVICE_PAUSE_POLLING
 from .const import SERVICE_REBOOT_DECO
 from .const import SERVICE_RESUME_POLLING
+from .const import SESSION_SAVE_DELAY_SECONDS
+from .const import SESSION_STORAGE_KEY
+from .const import SESSION_STORAGE_VERSION
+from .const import STORES_KEY
 from .coordinator import TpLinkDeco
 from .coordinator import TpLinkDecoClient
 from .coordinator import TpLinkDecoData
@@ -62,6 +94,37 @@ from .coordinator import TplinkDecoUpdateCoordinator
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
 
+def _get_store(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    key: str,
+    version: int,
+    private: bool = False,
+) -> Store:
+    """
+    Return the store of the entry for key, a storage key with an {entry_id} field.
+
+    The store outlives reloads so a delayed save still pending is loaded again or
+    cancelled when the entry is removed.
+    """
+    stores = hass.data.setdefault(DOMAIN, {}).setdefault(STORES_KEY, {})
+    storage_key = key.format(entry_id=config_entry.entry_id)
+    store = stores.get(storage_key)
+    if store is None:
+        store = stores[storage_key] = Store(hass, version, storage_key, private=private)
+    return store
+
+
+def _get_session_store(hass: HomeAssistant, config_entry: ConfigEntry) -> Store:
+    return _get_store(
+        hass, config_entry, SESSION_STORAGE_KEY, SESSION_STORAGE_VERSION, private=True
+    )
+
+
+def _get_clients_store(hass: HomeAssistant, config_entry: ConfigEntry) -> Store:
+    return _get_store(hass, config_entry, CLIENTS_STORAGE_KEY, CLIENTS_STORAGE_VERSION)
+
+
 async def async_create_and_refresh_coordinators(
     hass: HomeAssistant,
     config_data: dict[str:Any],
@@ -77,24 +140,84 @@ async def async_create_and_refresh_coordinators(
     timeout_error_retries = config_data.get(CONF_TIMEOUT_ERROR_RETRIES)
     timeout_seconds = config_data.get(CONF_TIMEOUT_SECONDS)
     verify_ssl = config_data.get(CONF_VERIFY_SSL)
-    session = async_get_clientsession(hass)
+    hedge_requests = config_data.get(CONF_HEDGE_REQUESTS, False)
+    client_query_concurrency = config_data.get(
+        CONF_CLIENT_QUERY_CONCURRENCY, DEFAULT_CLIENT_QUERY_CONCURRENCY
+    )
+    min_client_interval = None
+    max_client_interval = None
+    if config_data.get(CONF_ADAPTIVE_CLIENT_INTERVAL, False):
+        min_client_interval = timedelta(
+            seconds=config_data.get(
+                CONF_CLIENT_MIN_INTERVAL, DEFAULT_CLIENT_MIN_INTERVAL
+            )
+        )
+        max_client_interval = max(
+            min_client_interval,
+            timedelta(
+                seconds=config_data.get(
+                    CONF_CLIENT_MAX_INTERVAL, DEFAULT_CLIENT_MAX_INTERVAL
+                )
+            ),
+        )
+    # 0 keeps clients forever
+    client_retention_days = config_data.get(
+        CONF_CLIENT_RETENTION_DAYS, DEFAULT_CLIENT_RETENTION_DAYS
+    )
+    # 0 polls on every update
+    device_list_interval_seconds = config_data.get(
+        CONF_DEVICE_LIST_INTERVAL, DEFAULT_DEVICE_LIST_INTERVAL
+    )
+    performance_interval_seconds = config_data.get(
+        CONF_PERFORMANCE_INTERVAL, DEFAULT_PERFORMANCE_INTERVAL
+    )
 
     api = TplinkDecoApi(
-        session,
         host,
         username,
         password,
         verify_ssl,
         timeout_error_retries,
         timeout_seconds,
+        # Only client lists may run in parallel, everything else is serialized
+        endpoint_concurrency={ENDPOINT_CLIENT_LIST: client_query_concurrency},
+        hedge_requests=hedge_requests,
     )
+    if config_entry is not None:
+        # Reuse the last login session so startup can skip the login handshake
+        session_store = _get_session_store(hass, config_entry)
+        api.restore_session(await session_store.async_load())
+        api.on_session_change(
+            lambda: session_store.async_delay_save(
+                api.export_session, SESSION_SAVE_DELAY_SECONDS
+            )
+        )
+
     deco_coordinator = TplinkDecoUpdateCoordinator(
-        hass, api, config_entry, update_interval, deco_data
+        hass,
+        api,
+        config_entry,
+        update_interval,
+        deco_data,
+        device_list_interval=(
+            timedelta(seconds=device_list_interval_seconds)
+            if device_list_interval_seconds
+            else None
+        ),
+        performance_interval=(
+            timedelta(seconds=performance_interval_seconds)
+            if performance_interval_seconds
+            else None
+        ),
     )
-    if config_entry is None:
-        await deco_coordinator._async_update_data()
-    else:
-        await deco_coordinator.async_config_entry_first_refresh()
+    try:
+        if config_entry is None:
+            await deco_coordinator._async_update_data()
+        else:
+            await deco_coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await api.async_close()
+        raise
     clients_coordinator = TplinkDecoClientUpdateCoordinator(
         hass,
         api,
@@ -103,7 +226,42 @@ async def async_create_and_refresh_coordinators(
         consider_home_seconds,
         update_interval,
         client_data,
+        min_update_interval=min_client_interval,
+        max_update_interval=max_client_interval,
+        shard_size=config_data.get(
+            CONF_CLIENT_QUERY_SHARD_SIZE, DEFAULT_CLIENT_QUERY_SHARD_SIZE
+        ),
+        client_retention=(
+            timedelta(days=client_retention_days) if client_retention_days else None
+        ),
+        max_clients=config_data.get(CONF_MAX_CLIENTS, DEFAULT_MAX_CLIENTS),
+        top_clients_count=config_data.get(
+            CONF_TOP_CLIENTS_COUNT, DEFAULT_TOP_CLIENTS_COUNT
+        ),
     )
+    if config_entry is not None:
+        # Save when clients were last seen so client retention survives restarts
+        clients_store = _get_clients_store(hass, config_entry)
+        save_pending = False
+
+        def export_clients() -> dict[str, Any]:
+            nonlocal save_pending
+            save_pending = False
+            return {"last_seen": clients_coordinator.export_last_seen()}
+
+        @callback
+        def async_save_clients() -> None:
+            nonlocal save_pending
+            # Delayed saves are postponed by each call, so only schedule one
+            if not save_pending:
+                save_pending = True
+                clients_store.async_delay_save(
+                    export_clients, CLIENTS_SAVE_DELAY_SECONDS
+                )
+
+        config_entry.async_on_unload(
+            clients_coordinator.async_add_listener(async_save_clients)
+        )
     return {
         COORDINATOR_DECOS_KEY: deco_coordinator,
         COORDINATOR_CLIENTS_KEY: clients_coordinator,
@@ -130,6 +288,9 @@ async def async_create_config_data(hass: HomeAssistant, config_entry: ConfigEntr
     # Populate client list with existing entries so that we keep track of disconnected clients
     # since deco list_clients only returns connected clients.
     last_states = restore_state.async_get(hass).last_states
+    clients_data = await _get_clients_store(hass, config_entry).async_load() or {}
+    last_seen = clients_data.get("last_seen", {})
+    now = dt_util.utcnow()
     for entry in existing_entries:
         if entry.domain != DEVICE_TRACKER_DOMAIN:
             continue
@@ -146,6 +307,10 @@ async def async_create_config_data(hass: HomeAssistant, config_entry: ConfigEntr
         else:
             client = TpLinkDecoClient(entry.unique_id)
             client.name = normalize_name(entry.original_name)
+            # Clients saved before last seen times were stored count from now
+            client.last_activity = (
+                dt_util.parse_datetime(last_seen.get(entry.unique_id, "")) or now
+            )
             client_data[entry.unique_id] = client
 
     return await async_create_and_refresh_coordinators(
@@ -196,6 +361,14 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     deco_coordinator = data[COORDINATOR_DECOS_KEY]
     clients_coordinator = data[COORDINATOR_CLIENTS_KEY]
 
+    async def async_close_api(event: Event) -> None:
+        """Close the API's HTTP session when Home Assistant stops."""
+        await deco_coordinator.api.async_close()
+
+    config_entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, async_close_api)
+    )
+
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
 
     config_entry.async_create_background_task(
@@ -278,6 +451,8 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
         await deco_coordinator.async_close()
     if clients_coordinator is not None:
         await clients_coordinator.async_close()
+    if deco_coordinator is not None:
+        await deco_coordinator.api.async_close()
 
     unloaded = all(
         await asyncio.gather(
@@ -296,6 +471,16 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the saved login session and clients."""
+    for store in (
+        _get_session_store(hass, config_entry),
+        _get_clients_store(hass, config_entry),
+    ):
+        hass.data[DOMAIN][STORES_KEY].pop(store.key)
+        await store.async_remove()
+
+
 async def update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Update options."""
     _LOGGER.debug("update_listener: Reloading %s", config_entry.entry_id)
@@ -1,13 +1,22 @@
 import asyncio
 import base64
+import binascii
+import codecs
+from collections import deque
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from contextlib import suppress
 import hashlib
 import json
 import logging
 import math
 import re
 import secrets
+import statistics
+import time
 from typing import Any
 from urllib.parse import quote_plus
+from urllib.parse import urlsplit
 
 from Crypto.Cipher import PKCS1_v1_5
 from Crypto.PublicKey import RSA
@@ -15,29 +24,79 @@ import aiohttp
 from aiohttp.hdrs import CONTENT_TYPE
 from aiohttp.hdrs import SET_COOKIE
 import async_timeout
-from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.primitives.ciphers import Cipher
 from cryptography.hazmat.primitives.ciphers import algorithms
 from cryptography.hazmat.primitives.ciphers import modes
 import homeassistant.util.ssl as ssl
 
+from .circuit_breaker import STATE_CLOSED
+from .circuit_breaker import STATE_HALF_OPEN
+from .circuit_breaker import CircuitBreaker
 from .const import DEFAULT_TIMEOUT_ERROR_RETRIES
 from .const import DEFAULT_TIMEOUT_SECONDS
+from .exceptions import CircuitOpenException
 from .exceptions import EmptyDataException
 from .exceptions import ForbiddenException
 from .exceptions import LoginForbiddenException
 from .exceptions import LoginInvalidException
 from .exceptions import TimeoutException
 from .exceptions import UnexpectedApiException
-
+from .latency import LatencyTracker
+from .scheduler import PRIORITY_INTERACTIVE
+from .scheduler import PRIORITY_PRESENCE
+from .scheduler import PRIORITY_RENEWAL
+from .scheduler import PRIORITY_TELEMETRY
+from .scheduler import RequestScheduler
+
+AES_BLOCK_BYTES = 16
 AES_KEY_BYTES = 16
 MIN_AES_KEY = 10 ** (AES_KEY_BYTES - 1)
 MAX_AES_KEY = (10**AES_KEY_BYTES) - 1
 
 PKCS1_v1_5_HEADER_BYTES = 11
 
+# Endpoint names used for request scheduling
+ENDPOINT_CLIENT_LIST = "client_list"
+ENDPOINT_DEVICE_LIST = "device_list"
+ENDPOINT_LOGIN = "login"
+ENDPOINT_PERFORMANCE = "performance"
+ENDPOINT_REBOOT = "reboot"
+
+# Latency is tracked per context, so per deco for client lists
+LIST_CLIENTS_CONTEXT = "List Clients {deco_mac}"
+
+# Keep connections open across a default scan interval so polls skip the TCP
+# (and for HTTPS firmwares, TLS) handshake.
+CONNECTION_KEEPALIVE_SECONDS = 60
+DNS_CACHE_SECONDS = 300
+
+# The password RSA key rarely changes, so it is reused across re-logins until it
+# is this old.
+PASSWORD_KEY_MAX_AGE_SECONDS = 24 * 60 * 60
+
+# Sessions are renewed once they reach this fraction of the expected lifetime.
+# Lifetimes shorter than the minimum are ignored since those are usually caused
+# by logging in on another device rather than the session timing out.
+SESSION_RENEW_LIFETIME_FRACTION = 0.8
+SESSION_LIFETIME_MIN_SECONDS = 60
+SESSION_LIFETIME_SAMPLES = 10
+SESSION_LIFETIME_BUCKET_MINUTES = (5, 15, 30, 60, 120, 240, 480, 1440)
+
+# While the circuit breaker is open, probes start with a TCP connect which is much
+# cheaper for a recovering router than a full request.
+CIRCUIT_PROBE_TIMEOUT_SECONDS = 5
+
+# Chunk size used when streaming large responses
+STREAM_CHUNK_BYTES = 16384
+
+# Encoded request bodies only depend on the payload and seq, so the few
+# constant read payloads can be reused for the lifetime of the login.
+ENCODED_PAYLOAD_CACHE_SIZE = 32
+
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 LEGACY_ERROR_DECODING_PATTERN = re.compile(r"^<Error Decoding (.*)>$")
+STOK_PATTERN = re.compile(r";stok=([^/]*)/")
+CONNECTION_ERRORS = (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError)
 
 
 def normalize_name(name: str):
@@ -52,6 +111,12 @@ def normalize_name(name: str):
     return name
 
 
+def get_url_stok(url: str) -> str | None:
+    """Return the session token a request url was built with."""
+    match = STOK_PATTERN.search(url)
+    return (match.group(1) or None) if match else None
+
+
 def byte_len(n: int) -> int:
     return (int(math.log2(n)) + 8) >> 3
 
@@ -68,59 +133,227 @@ def decode_name_with_fallback(name: str):
         return normalize_name(name)
 
 
-def rsa_encrypt(n: int, e: int, plaintext: bytes) -> bytes:
+class RsaEncryptor:
     """
-    RSA encrypts plaintext. TP-Link breaks the plaintext down into blocks and concatenates the output.
-    :param n: The RSA public key's n value
-    :param e: The RSA public key's e value
-    :param plaintext: The data to encrypt
-    :return: RSA encrypted ciphertext
+    RSA encrypts plaintext with a fixed public key.
+
+    TP-Link breaks the plaintext down into blocks and concatenates the output. The
+    key and block sizes are computed once so the encryptor can be reused across
+    requests.
     """
-    public_key = RSA.construct((n, e)).publickey()
-    encryptor = PKCS1_v1_5.new(public_key)
-    block_size = byte_len(n)
-    bytes_per_block = block_size - PKCS1_v1_5_HEADER_BYTES
 
-    encrypted_text = ""
-    text_bytes = len(plaintext)
-    index = 0
-    while index < text_bytes:
-        content_num_bytes = min(bytes_per_block, text_bytes - index)
-        content = plaintext[index : index + content_num_bytes]
-        encrypted_text += encryptor.encrypt(content).hex()
-        index += content_num_bytes
+    def __init__(self, n: int, e: int) -> None:
+        """
+        :param n: The RSA public key's n value
+        :param e: The RSA public key's e value
+        """
+        self.n = n
+        self.e = e
+        self._cipher = PKCS1_v1_5.new(RSA.construct((n, e)))
+        self._block_size = byte_len(n)
+        self._bytes_per_block = self._block_size - PKCS1_v1_5_HEADER_BYTES
+
+    def encrypt(self, plaintext: bytes) -> str:
+        """
+        RSA encrypts plaintext.
+        :param plaintext: The data to encrypt
+        :return: RSA encrypted ciphertext as hex
+        """
+        block_size = self._block_size
+        bytes_per_block = self._bytes_per_block
+        num_blocks = -(-len(plaintext) // bytes_per_block)
+        encrypted = bytearray(num_blocks * block_size)
+        for block in range(num_blocks):
+            index = block * bytes_per_block
+            offset = block * block_size
+            encrypted[offset : offset + block_size] = self._cipher.encrypt(
+                plaintext[index : index + bytes_per_block]
+            )
+        return encrypted.hex()
 
-    return encrypted_text
 
+class AesCodec:
+    """
+    AES-CBC with PKCS #7 padding bound to a fixed key and IV. This matches the AES
+    options on TP-Link routers.
+    """
 
-def aes_encrypt(key: bytes, iv: bytes, plaintext: bytes) -> bytes:
+    def __init__(self, key: bytes, iv: bytes) -> None:
+        """
+        :param key: The AES key
+        :param iv: The AES IV
+        """
+        self._cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        """
+        AES-CBC encrypt with PKCS #7 padding.
+        :param plaintext: Data to encrypt
+        :return: Ciphertext
+        """
+        num_padding_bytes = AES_BLOCK_BYTES - len(plaintext) % AES_BLOCK_BYTES
+        padded = bytearray(plaintext)
+        padded.extend(bytes((num_padding_bytes,)) * num_padding_bytes)
+        encryptor = self._cipher.encryptor()
+        return encryptor.update(padded) + encryptor.finalize()
+
+    def decrypt(self, ciphertext: bytes) -> bytearray:
+        """
+        AES-CBC decrypt into a single buffer and strip the PKCS #7 padding in place.
+        :param ciphertext: Data to decrypt
+        :return: Plaintext
+        """
+        decryptor = self._cipher.decryptor()
+        # update_into requires room for one extra block minus one byte
+        plaintext = bytearray(len(ciphertext) + AES_BLOCK_BYTES - 1)
+        length = decryptor.update_into(ciphertext, plaintext)
+        decryptor.finalize()
+        num_padding_bytes = plaintext[length - 1]
+        del plaintext[length - num_padding_bytes :]
+        return plaintext
+
+    def decryptor(self):
+        """Return a new incremental AES-CBC decryptor. Padding is not removed."""
+        return self._cipher.decryptor()
+
+
+class EncryptedDataStream:
     """
-    AES-CBC encrypt with PKCS #7 padding. This matches the AES options on TP-Link routers.
-    :param key: The AES key
-    :param iv: The AES IV
-    :param plaintext: Data to encrypt
-    :return: Ciphertext
+    Incrementally extracts, base64 decodes and decrypts the "data" field of a
+    response envelope as it streams in.
+
+    Decrypted bytes are passed to on_plaintext as soon as they are known not to
+    contain PKCS #7 padding. The rest of the envelope is returned by close().
     """
-    padder = padding.PKCS7(algorithms.AES.block_size).padder()
-    plaintext_bytes: bytes = padder.update(plaintext) + padder.finalize()
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
-    encryptor = cipher.encryptor()
-    ciphertext = encryptor.update(plaintext_bytes) + encryptor.finalize()
-    return ciphertext
 
+    DATA_START = re.compile(rb'"data"\s*:\s*"')
+
+    def __init__(self, codec: AesCodec, on_plaintext: Callable[[bytes], None]):
+        self._decryptor = codec.decryptor()
+        self._on_plaintext = on_plaintext
+        self._head = bytearray()
+        self._tail = None
+        self._in_data = False
+        self._base64_remainder = b""
+        # Last decrypted block, which may be the one holding the padding
+        self._last_block = b""
+        self.data_length = 0
+
+    def feed(self, chunk: bytes) -> None:
+        if self._tail is not None:
+            self._tail += chunk
+            return
 
-def aes_decrypt(key: bytes, iv: bytes, plaintext: bytes) -> bytes:
+        if not self._in_data:
+            self._head += chunk
+            match = self.DATA_START.search(self._head)
+            if match is None:
+                return
+            chunk = bytes(self._head[match.end() :])
+            del self._head[match.end() :]
+            self._in_data = True
+
+        end = chunk.find(b'"')
+        if end == -1:
+            self._feed_base64(chunk)
+        else:
+            self._feed_base64(chunk[:end])
+            self._tail = bytearray(chunk[end:])
+
+    def _feed_base64(self, data: bytes) -> None:
+        # JSON encoders may escape "/" as "\/"
+        data = self._base64_remainder + data.replace(b"\\", b"")
+        self.data_length += len(data) - len(self._base64_remainder)
+        usable = len(data) - len(data) % 4
+        self._base64_remainder = data[usable:]
+        if usable:
+            self._feed_ciphertext(binascii.a2b_base64(data[:usable]))
+
+    def _feed_ciphertext(self, ciphertext: bytes) -> None:
+        plaintext = self._last_block + self._decryptor.update(ciphertext)
+        if len(plaintext) > AES_BLOCK_BYTES:
+            self._on_plaintext(plaintext[:-AES_BLOCK_BYTES])
+            plaintext = plaintext[-AES_BLOCK_BYTES:]
+        self._last_block = plaintext
+
+    def close(self) -> dict:
+        """Flush the final block and return the envelope with "data" emptied."""
+        if not self._in_data:
+            return json.loads(self._head)
+        if self._tail is None or self._base64_remainder:
+            raise ValueError("Truncated data field")
+
+        self._decryptor.finalize()
+        if self._last_block:
+            num_padding_bytes = self._last_block[-1]
+            self._on_plaintext(self._last_block[:-num_padding_bytes])
+        return json.loads(self._head + self._tail)
+
+
+class JsonArrayStream:
     """
-    AES-CBC decrypt with PKCS #7 padding.
-    :param key: The AES key
-    :param iv: The AES IV
-    :param plaintext: Data to encrypt
-    :return: Ciphertext
+    Incrementally parses the items of the JSON array stored under key.
+
+    Items are passed to on_item as soon as they are complete. The rest of the
+    document is returned by close() with the array emptied.
     """
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
-    decryptor = cipher.decryptor()
-    ciphertext = decryptor.update(plaintext) + decryptor.finalize()
-    return ciphertext
+
+    def __init__(self, key: str, on_item: Callable[[Any], None]) -> None:
+        self._array_start = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+        self._on_item = on_item
+        self._json_decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._head = None
+        self._array_closed = False
+
+    def feed(self, data: bytes) -> None:
+        self._buffer += self._text_decoder.decode(data)
+        if self._head is None:
+            match = self._array_start.search(self._buffer)
+            if match is None:
+                return
+            self._head = self._buffer[: match.end()]
+            self._buffer = self._buffer[match.end() :]
+        if not self._array_closed:
+            self._parse_items()
+
+    def _parse_items(self) -> None:
+        buffer = self._buffer
+        length = len(buffer)
+        index = 0
+        while True:
+            while index < length and buffer[index] in " \t\r\n,":
+                index += 1
+            if index == length:
+                break
+            if buffer[index] == "]":
+                self._array_closed = True
+                break
+            start = index
+            try:
+                item, index = self._json_decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                # Item is not complete yet
+                break
+            while index < length and buffer[index] in " \t\r\n":
+                index += 1
+            if index == length or buffer[index] not in ",]":
+                # A number may continue in the next chunk, like "1" of "1.5",
+                # so items are only complete once followed by "," or "]"
+                index = start
+                break
+            self._on_item(item)
+        self._buffer = buffer[index:]
+
+    def close(self) -> Any:
+        """Return the parsed document with the streamed array emptied."""
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        if self._head is None:
+            return json.loads(self._buffer)
+        if not self._array_closed:
+            raise ValueError("Truncated JSON array")
+        return json.loads(self._head + self._buffer)
 
 
 def check_data_error_code(context, data):
@@ -133,40 +366,78 @@ def check_data_error_code(context, data):
         raise UnexpectedApiException(f"{context} error_code={error_code}")
 
 
+def check_response_error_code(context, response_json):
+    if "error_code" in response_json:
+        error_code = response_json.get("error_code")
+        if error_code != 0 and error_code != "":
+            _LOGGER.debug(
+                "%s error_code=%s",
+                context,
+                error_code,
+            )
+            raise UnexpectedApiException(f"{context} error: {error_code}")
+
+
 class TplinkDecoApi:
     def __init__(
         self,
-        session: aiohttp.ClientSession,
         host: str,
         username: str,
         password: str,
         verify_ssl: bool,
         timeout_error_retries: int = DEFAULT_TIMEOUT_ERROR_RETRIES,
         timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
+        max_concurrent_requests: int = 1,
+        endpoint_concurrency: dict[str, int] | None = None,
+        hedge_requests: bool = False,
     ) -> None:
         self._host = host
         self._username = username
         self._password = password
-        self._session = session
-        self._operation_lock = asyncio.Lock()
+        self._auth_hash = hashlib.md5(f"{username}{password}".encode()).digest().hex()
+        # The API owns its HTTP session so the connection pool can be tuned for the
+        # Deco instead of sharing Home Assistant's connector limits.
+        self._session: aiohttp.ClientSession | None = None
+        self._connections_created = 0
+        self._connections_reused = 0
+        self._scheduler = RequestScheduler(
+            max_concurrent_requests,
+            endpoint_concurrency,
+            # Session renewal replaces the session, so no request may be using it
+            exclusive_endpoints=frozenset({ENDPOINT_LOGIN}),
+        )
         self._timeout_error_retries = timeout_error_retries
         self._timeout_seconds = timeout_seconds
+        self._latency_trackers: dict[str, LatencyTracker] = {}
+        self._hedge_requests = hedge_requests
+        self._hedged_request_count = 0
+        self._circuit_breaker = CircuitBreaker()
         self._auth_errors = 0
 
         self._aes_key = None
-        self._aes_key_bytes = None
         self._aes_iv = None
-        self._aes_iv_bytes = None
+        self._aes_codec = None
 
-        self._password_rsa_n = None
-        self._password_rsa_e = None
-        self._sign_rsa_n = None
-        self._sign_rsa_e = None
+        self._password_encryptor = None
+        self._password_encrypted = None
+        self._password_key_fetched_at = None
+        self._sign_encryptor = None
 
         self._login_future = None
         self._seq = None
         self._stok = None
         self._cookie = None
+        self._encoded_payload_cache: dict[tuple[str, int], str] = {}
+        # Set while using a session restored from storage that has not been
+        # confirmed by a successful request yet.
+        self._session_restored = False
+        self._on_session_change: list[Callable[[], None]] = []
+        self._session_started_at = None
+        self._session_lifetimes = deque(maxlen=SESSION_LIFETIME_SAMPLES)
+        self._session_lifetime_histogram = [0] * (
+            len(SESSION_LIFETIME_BUCKET_MINUTES) + 1
+        )
+        self._session_renewals = 0
 
         if verify_ssl:
             self._ssl_context = None
@@ -176,8 +447,9 @@ class TplinkDecoApi:
 
     # Return list of deco devices
     async def async_list_devices(self) -> dict:
-        async with self._operation_lock:
-            return await self._async_call_with_retry(self._async_list_devices)
+        return await self._async_call_with_retry(
+            PRIORITY_PRESENCE, ENDPOINT_DEVICE_LIST, self._async_list_devices
+        )
 
     async def _async_list_devices(self) -> dict:
         await self.async_login_if_needed()
@@ -189,6 +461,7 @@ class TplinkDecoApi:
             f"{self._host}/cgi-bin/luci/;stok={self._stok}/admin/device",
             params={"form": "device_list"},
             data=self._encode_payload(device_list_payload),
+            idempotent=True,
         )
         data = self._decrypt_data(context, response_json["data"])
         check_data_error_code(context, data)
@@ -211,7 +484,8 @@ class TplinkDecoApi:
 
     # Reboot decos.
     async def async_reboot_decos(self, deco_macs) -> dict:
-        async with self._operation_lock:
+        async with self._scheduler.async_slot(PRIORITY_INTERACTIVE, ENDPOINT_REBOOT):
+            await self._async_check_circuit()
             return await self._async_reboot_decos(deco_macs)
 
     async def _async_reboot_decos(self, deco_macs) -> dict:
@@ -235,8 +509,9 @@ class TplinkDecoApi:
 
     # Return performance data (CPU / memory)
     async def async_get_performance(self) -> dict:
-        async with self._operation_lock:
-            return await self._async_call_with_retry(self._async_get_performance)
+        return await self._async_call_with_retry(
+            PRIORITY_TELEMETRY, ENDPOINT_PERFORMANCE, self._async_get_performance
+        )
 
     async def _async_get_performance(self) -> dict:
         await self.async_login_if_needed()
@@ -249,6 +524,7 @@ class TplinkDecoApi:
             f"{self._host}/cgi-bin/luci/;stok={self._stok}/admin/network",
             params={"form": "performance"},
             data=self._encode_payload(performance_payload),
+            idempotent=True,
         )
 
         data = self._decrypt_data(context, response_json["data"])
@@ -256,33 +532,79 @@ class TplinkDecoApi:
         return data
 
     # Return list of clients. Default lists clients for all decos.
+    # Stream decrypts and parses the response as it arrives to keep peak memory
+    # flat for large client lists. Streamed requests are never hedged.
     async def async_list_clients(
-        self, deco_mac="default", timeout_error_retries: int | None = None
+        self,
+        deco_mac="default",
+        timeout_error_retries: int | None = None,
+        stream: bool = False,
+        count_timeouts: bool = True,
     ) -> dict:
-        async with self._operation_lock:
-            return await self._async_call_with_retry(
-                self._async_list_clients,
-                deco_mac,
-                timeout_error_retries=timeout_error_retries,
-            )
+        """
+        List the clients connected to deco_mac, or to the whole mesh by default.
+
+        Timeouts only count against the circuit breaker if count_timeouts is set,
+        so queries some firmware does not answer can be tried without pausing all
+        requests.
+        """
+        return await self._async_call_with_retry(
+            PRIORITY_PRESENCE,
+            ENDPOINT_CLIENT_LIST,
+            self._async_list_clients,
+            deco_mac,
+            stream,
+            count_timeouts,
+            timeout_error_retries=timeout_error_retries,
+        )
 
-    async def _async_list_clients(self, deco_mac) -> dict:
-        await self.async_login_if_needed()
+    def get_client_list_seconds(self, deco_mac="default") -> float | None:
+        """
+        Return how long the last client list request for deco_mac took.
 
-        context = f"List Clients {deco_mac}"
-        client_payload = {"operation": "read", "params": {"device_mac": deco_mac}}
-        response_json = await self._async_post(
-            context,
-            f"{self._host}/cgi-bin/luci/;stok={self._stok}/admin/client",
-            params={"form": "client_list"},
-            data=self._encode_payload(client_payload),
+        Only the request itself is timed, not waiting for a scheduler slot.
+        """
+        tracker = self._latency_trackers.get(
+            LIST_CLIENTS_CONTEXT.format(deco_mac=deco_mac)
         )
+        return None if tracker is None else tracker.last
 
-        data = self._decrypt_data(context, response_json["data"])
+    async def _async_list_clients(
+        self, deco_mac, stream=False, count_timeouts=True
+    ) -> dict:
+        await self.async_login_if_needed()
+
+        context = LIST_CLIENTS_CONTEXT.format(deco_mac=deco_mac)
+        client_payload = {"operation": "read", "params": {"device_mac": deco_mac}}
+        url = f"{self._host}/cgi-bin/luci/;stok={self._stok}/admin/client"
+        params = {"form": "client_list"}
+        if stream:
+            client_list = []
+            data = await self._async_post_stream(
+                context,
+                url,
+                params=params,
+                data=self._encode_payload(client_payload),
+                array_key="client_list",
+                on_item=client_list.append,
+            )
+        else:
+            response_json = await self._async_post(
+                context,
+                url,
+                params=params,
+                data=self._encode_payload(client_payload),
+                idempotent=True,
+                count_timeouts=count_timeouts,
+            )
+            data = self._decrypt_data(context, response_json["data"])
         check_data_error_code(context, data)
 
         try:
-            client_list = data["result"]["client_list"]
+            if not stream:
+                client_list = data["result"]["client_list"]
+            elif "client_list" not in data["result"]:
+                raise KeyError("client_list")
             # client_list is only the connected clients
             _LOGGER.debug("%s client_count=%d", context, len(client_list))
 
@@ -298,8 +620,9 @@ class TplinkDecoApi:
         # TPLink requires key and IV to be a 16 digit number (no leading 0s)
         self._aes_key = secrets.randbelow(MAX_AES_KEY - MIN_AES_KEY) + MIN_AES_KEY
         self._aes_iv = secrets.randbelow(MAX_AES_KEY - MIN_AES_KEY) + MIN_AES_KEY
-        self._aes_key_bytes = str(self._aes_key).encode("utf-8")
-        self._aes_iv_bytes = str(self._aes_iv).encode("utf-8")
+        self._aes_codec = AesCodec(
+            str(self._aes_key).encode("utf-8"), str(self._aes_iv).encode("utf-8")
+        )
         _LOGGER.debug("Generated login encryption values")
 
     # Fetch password RSA keys
@@ -314,8 +637,9 @@ class TplinkDecoApi:
 
         try:
             keys = response_json["result"]["password"]
-            self._password_rsa_n = int(keys[0], 16)
-            self._password_rsa_e = int(keys[1], 16)
+            self._set_password_encryptor(
+                RsaEncryptor(int(keys[0], 16), int(keys[1], 16))
+            )
             _LOGGER.debug("Fetched password encryption key")
         except Exception as err:
             _LOGGER.error("%s parse response error=%s", context, err)
@@ -334,8 +658,9 @@ class TplinkDecoApi:
         try:
             auth_result = response_json["result"]
             auth_key = auth_result["key"]
-            self._sign_rsa_n = int(auth_key[0], 16)
-            self._sign_rsa_e = int(auth_key[1], 16)
+            self._sign_encryptor = RsaEncryptor(
+                int(auth_key[0], 16), int(auth_key[1], 16)
+            )
 
             self._seq = auth_result["seq"]
             _LOGGER.debug("Fetched request signing key")
@@ -361,23 +686,42 @@ class TplinkDecoApi:
             raise err
         finally:
             # Await future to suppress future exception was never retrieved error
-            try:
+            with suppress(Exception):
                 await self._login_future
-            except Exception:
-                pass
             self._login_future = None
 
-    async def _async_login(self):
+    def _set_password_encryptor(self, encryptor: RsaEncryptor | None) -> None:
+        self._password_encryptor = encryptor
+        self._password_encrypted = None
+        self._password_key_fetched_at = None if encryptor is None else time.monotonic()
+
+    def _is_password_key_valid(self) -> bool:
+        return (
+            self._password_encryptor is not None
+            and time.monotonic() - self._password_key_fetched_at
+            < PASSWORD_KEY_MAX_AGE_SECONDS
+        )
+
+    async def _async_login(self, retry_stale_key: bool = True):
         if self._aes_key is None:
             self._generate_aes_key_and_iv()
-        if self._password_rsa_n is None:
-            await self._async_fetch_keys()
-        if self._seq is None:
-            await self._async_fetch_auth()
 
-        password_encrypted = rsa_encrypt(
-            self._password_rsa_n, self._password_rsa_e, self._password.encode()
-        )
+        # The password key and auth fetches are independent, so run them together
+        fetches = []
+        password_key_cached = self._is_password_key_valid()
+        if not password_key_cached:
+            fetches.append(self._async_fetch_keys())
+        if self._seq is None:
+            fetches.append(self._async_fetch_auth())
+        if fetches:
+            await asyncio.gather(*fetches)
+
+        # The encrypted password stays valid as long as the password key does
+        if self._password_encrypted is None:
+            self._password_encrypted = self._password_encryptor.encrypt(
+                self._password.encode()
+            )
+        password_encrypted = self._password_encrypted
 
         login_payload = {
             "params": {"password": password_encrypted},
@@ -393,10 +737,8 @@ class TplinkDecoApi:
             )
         except ForbiddenException as err:
             raise LoginForbiddenException(
-                (
-                    "Login auth error. Likely caused by logging in with admin account on another device."
-                    " See https://github.com/amosyuen/ha-tplink-deco#manager-account."
-                )
+                "Login auth error. Likely caused by logging in with admin account on another device."
+                " See https://github.com/amosyuen/ha-tplink-deco#manager-account."
             ) from err
 
         data = self._decrypt_data(context, response_json["data"])
@@ -405,6 +747,14 @@ class TplinkDecoApi:
         if error_code != 0:
             if error_code == -5002:
                 self.clear_auth()
+                # Refetch the password key in case it changed
+                self._set_password_encryptor(None)
+                if password_key_cached and retry_stale_key:
+                    # A Deco generates a new password key when it reboots, so
+                    # the cached key may be stale rather than the password wrong
+                    _LOGGER.debug("Login with cached password key failed, retrying")
+                    await self._async_login(retry_stale_key=False)
+                    return
                 attempts = result.get("attemptsAllowed", "unknown")
                 raise LoginInvalidException(attempts)
             raise UnexpectedApiException(f"Login error data={data}")
@@ -423,7 +773,10 @@ class TplinkDecoApi:
 
         # Login success
         self._auth_errors = 0
+        self._session_restored = False
+        self._session_started_at = time.monotonic()
         _LOGGER.debug("Login successful")
+        self._notify_session_change()
 
     async def _async_post(
         self,
@@ -431,7 +784,148 @@ class TplinkDecoApi:
         url: str,
         params: dict[str:Any],
         data: Any,
+        idempotent: bool = False,
+        count_timeouts: bool = True,
+    ) -> dict:
+        """
+        Post and return the response JSON.
+
+        If hedging is enabled, idempotent requests that run well past their p99
+        latency get a second identical request and the first response wins. A
+        failed attempt is only held against the connection if every attempt
+        fails, and a request whose attempts all time out counts as one timeout.
+        """
+        tracker = self._latency_trackers.get(context)
+        hedge_delay = (
+            tracker.get_hedge_delay()
+            if idempotent and self._hedge_requests and tracker is not None
+            else None
+        )
+        if hedge_delay is None or hedge_delay >= tracker.get_timeout(
+            self._timeout_seconds
+        ):
+            return await self._async_post_once(
+                context, url, params, data, count_timeouts=count_timeouts
+            )
+
+        tasks = {
+            asyncio.ensure_future(
+                self._async_post_once(context, url, params, data, hedged=True)
+            )
+        }
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                _LOGGER.debug(
+                    "%s still running after %.1fs, sending hedged request",
+                    context,
+                    hedge_delay,
+                )
+                self._hedged_request_count += 1
+                tasks.add(
+                    asyncio.ensure_future(
+                        self._async_post_once(context, url, params, data, hedged=True)
+                    )
+                )
+            errors = []
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+            error = errors[0]
+            if isinstance(error, CONNECTION_ERRORS):
+                self._record_connection_error(url)
+            elif count_timeouts and all(
+                isinstance(err, TimeoutException) for err in errors
+            ):
+                self._circuit_breaker.record_failure()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_post_once(
+        self,
+        context: str,
+        url: str,
+        params: dict[str:Any],
+        data: Any,
+        hedged: bool = False,
+        count_timeouts: bool = True,
+    ) -> dict:
+        async with self._async_request(
+            context, url, params, data, hedged=hedged, count_timeouts=count_timeouts
+        ) as response:
+            # Soms antwoordt de server met de verkeerde content-type
+            response_json = await response.json(content_type=None)
+            check_response_error_code(context, response_json)
+            if response_json.get("data") == "":
+                self._expire_session(get_url_stok(url))
+                message = f"{context} data is empty"
+                raise EmptyDataException(message)
+            return response_json
+
+    async def _async_post_stream(
+        self,
+        context: str,
+        url: str,
+        params: dict[str:Any],
+        data: Any,
+        array_key: str,
+        on_item: Callable[[Any], None],
     ) -> dict:
+        """
+        Post and decrypt the response "data" field while it streams in.
+
+        Items of the array under array_key are passed to on_item as they are
+        parsed. Returns the decrypted data with that array emptied.
+        """
+        async with self._async_request(context, url, params, data) as response:
+            try:
+                data_stream = JsonArrayStream(array_key, on_item)
+                envelope_stream = EncryptedDataStream(self._aes_codec, data_stream.feed)
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_BYTES):
+                    envelope_stream.feed(chunk)
+                response_json = envelope_stream.close()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                raise
+            except Exception as err:
+                _LOGGER.error("%s decode data error=%s", context, err)
+                raise err
+
+        check_response_error_code(context, response_json)
+        if envelope_stream.data_length == 0:
+            self._expire_session(get_url_stok(url))
+            message = f"{context} data is empty"
+            raise EmptyDataException(message)
+
+        try:
+            return data_stream.close()
+        except Exception as err:
+            _LOGGER.error("%s decode data error=%s", context, err)
+            raise err
+
+    @asynccontextmanager
+    async def _async_request(
+        self,
+        context: str,
+        url: str,
+        params: dict[str:Any],
+        data: Any,
+        hedged: bool = False,
+        count_timeouts: bool = True,
+    ):
+        """
+        Post and yield the response.
+
+        Failures of hedged attempts are left to the caller, since the other
+        attempt may still succeed. Timeouts are not counted against the circuit
+        breaker unless count_timeouts is set.
+        """
         headers = {CONTENT_TYPE: "application/json"}
         # Gebruik een dictionary voor cookies in plaats van een string in headers
         request_cookies = {}
@@ -443,9 +937,14 @@ class TplinkDecoApi:
                     request_cookies[cookie_parts[0]] = cookie_parts[1]
             except Exception:
                 _LOGGER.warning("Could not parse session cookie")
+        tracker = self._latency_trackers.get(context)
+        if tracker is None:
+            tracker = self._latency_trackers[context] = LatencyTracker()
+        timeout = tracker.get_timeout(self._timeout_seconds)
+        start = time.monotonic()
         try:
-            async with async_timeout.timeout(self._timeout_seconds):
-                response = await self._session.post(
+            async with async_timeout.timeout(timeout):
+                response = await self._get_session().post(
                     url,
                     params=params,
                     data=data,
@@ -453,6 +952,8 @@ class TplinkDecoApi:
                     cookies=request_cookies,  # Gebruik de cookies parameter
                     ssl=self._ssl_context,
                 )
+                # Any response, even an error status, shows the Deco is reachable
+                self._circuit_breaker.record_success()
                 response.raise_for_status()
 
                 # Some Deco firmwares 307-redirect every http:// request to
@@ -474,6 +975,7 @@ class TplinkDecoApi:
                         context,
                         self._host,
                     )
+                    self._notify_session_change()
 
                 # Verbeterde extractie: loop door alle Set-Cookie headers
                 for cookie_header in response.headers.getall(SET_COOKIE, []):
@@ -483,24 +985,17 @@ class TplinkDecoApi:
                         _LOGGER.debug("Received new session cookie")
                         break
 
-                # Soms antwoordt de server met de verkeerde content-type
-                response_json = await response.json(content_type=None)
-                if "error_code" in response_json:
-                    error_code = response_json.get("error_code")
-                    if error_code != 0 and error_code != "":
-                        _LOGGER.debug(
-                            "%s error_code=%s",
-                            context,
-                            error_code,
-                        )
-                        raise UnexpectedApiException(f"{context} error: {error_code}")
-
-                return response_json
+                yield response
+            tracker.record(time.monotonic() - start)
         except asyncio.TimeoutError as err:
             _LOGGER.debug(
                 "%s timed out",
                 context,
             )
+            # Fall back to the configured timeout until there are new samples
+            tracker.reset()
+            if count_timeouts and not hedged:
+                self._circuit_breaker.record_failure()
             raise TimeoutException from err
         except aiohttp.ClientResponseError as err:
             _LOGGER.error(
@@ -509,16 +1004,16 @@ class TplinkDecoApi:
                 err,
             )
             if err.status == 401:
-                self.clear_auth()
+                self._clear_auth_if_current(get_url_stok(url))
                 raise err
             if err.status == 403:
-                self.clear_auth()
+                self._expire_session(get_url_stok(url))
                 message = f"{context} Forbidden error: {err}"
                 raise ForbiddenException(message) from err
             raise err
-        except (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError) as err:
-            # Clear auth in case deco rebooted and auth is invalid
-            self.clear_auth()
+        except CONNECTION_ERRORS as err:
+            if not hedged:
+                self._record_connection_error(url)
             _LOGGER.error(
                 "%s connection error: %s",
                 context,
@@ -533,12 +1028,56 @@ class TplinkDecoApi:
             )
             raise err
 
+    def _record_connection_error(self, url: str) -> None:
+        # Clear auth in case deco rebooted and auth is invalid
+        self._clear_auth_if_current(get_url_stok(url))
+        self._circuit_breaker.record_failure()
+
+    async def _async_check_circuit(self) -> None:
+        """Raise CircuitOpenException if requests to the Deco are paused."""
+        if not self._circuit_breaker.allow_request():
+            raise CircuitOpenException(self._circuit_breaker.get_retry_seconds())
+        if self._circuit_breaker.state != STATE_HALF_OPEN:
+            return
+        if not await self._async_can_connect():
+            self._circuit_breaker.record_failure()
+            raise CircuitOpenException(self._circuit_breaker.get_retry_seconds())
+        _LOGGER.debug("Deco accepted probe connection, sending probe request")
+
+    async def _async_can_connect(self) -> bool:
+        """Return whether a TCP connection to the Deco can be opened."""
+        url = urlsplit(self._host)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        try:
+            async with async_timeout.timeout(CIRCUIT_PROBE_TIMEOUT_SECONDS):
+                _, writer = await asyncio.open_connection(url.hostname, port)
+        except (OSError, asyncio.TimeoutError) as err:
+            _LOGGER.debug(
+                "Probe connection to %s:%d failed: %s", url.hostname, port, err
+            )
+            return False
+        writer.close()
+        with suppress(OSError):
+            await writer.wait_closed()
+        return True
+
     def _encode_payload(self, payload: Any):
-        data = self._encode_data(payload)
+        payload_json = json.dumps(payload, separators=(",", ":"))
+        cache_key = (payload_json, self._seq)
+        encoded_payload = self._encoded_payload_cache.get(cache_key)
+        if encoded_payload is not None:
+            return encoded_payload
+
+        data = self._encode_data(payload_json)
         sign = self._encode_sign(len(data))
         # Must URI encode data after calculating data length
-        payload = f"sign={sign}&data={quote_plus(data)}"
-        return payload
+        encoded_payload = f"sign={sign}&data={quote_plus(data)}"
+
+        if len(self._encoded_payload_cache) >= ENCODED_PAYLOAD_CACHE_SIZE:
+            # Evict the oldest entry
+            del self._encoded_payload_cache[next(iter(self._encoded_payload_cache))]
+        self._encoded_payload_cache[cache_key] = encoded_payload
+        return encoded_payload
 
     def _encode_sign(self, data_len: int):
         if self._seq is None:
@@ -546,44 +1085,277 @@ class TplinkDecoApi:
             message = "_seq is None"
             raise EmptyDataException(message)
         seq_with_data_len = self._seq + data_len
-        auth_hash = (
-            hashlib.md5(f"{self._username}{self._password}".encode()).digest().hex()
-        )
-        sign_text = (
-            f"k={self._aes_key}&i={self._aes_iv}&h={auth_hash}&s={seq_with_data_len}"
-        )
-        sign = rsa_encrypt(self._sign_rsa_n, self._sign_rsa_e, sign_text.encode())
+        sign_text = f"k={self._aes_key}&i={self._aes_iv}&h={self._auth_hash}&s={seq_with_data_len}"
+        sign = self._sign_encryptor.encrypt(sign_text.encode())
         return sign
 
-    def _encode_data(self, payload: Any):
-        payload_json = json.dumps(payload, separators=(",", ":"))
-
-        data_encrypted = aes_encrypt(
-            self._aes_key_bytes, self._aes_iv_bytes, payload_json.encode()
-        )
+    def _encode_data(self, payload_json: str):
+        data_encrypted = self._aes_codec.encrypt(payload_json.encode())
         data = base64.b64encode(data_encrypted).decode()
         return data
 
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(
+                self._async_on_connection_created
+            )
+            trace_config.on_connection_reuseconn.append(
+                self._async_on_connection_reused
+            )
+            peak_concurrency = self._scheduler.peak_concurrency
+            # Hedged requests can have two attempts in flight per slot. Either way
+            # there is a spare connection for the pre-login fetches to run together
+            limit_per_host = (
+                peak_concurrency * 2 if self._hedge_requests else peak_concurrency + 1
+            )
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=limit_per_host,
+                    keepalive_timeout=CONNECTION_KEEPALIVE_SECONDS,
+                    ttl_dns_cache=DNS_CACHE_SECONDS,
+                ),
+                # The sysauth cookie is managed explicitly per request
+                cookie_jar=aiohttp.DummyCookieJar(),
+                trace_configs=[trace_config],
+            )
+        return self._session
+
+    async def _async_on_connection_created(self, session, context, params):
+        self._connections_created += 1
+
+    async def _async_on_connection_reused(self, session, context, params):
+        self._connections_reused += 1
+
+    async def async_close(self) -> None:
+        """Close the HTTP session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+
+    def on_session_change(self, func: Callable[[], None]) -> None:
+        """Add a function to call when the login session changes."""
+        self._on_session_change.append(func)
+
+    def _notify_session_change(self) -> None:
+        for func in self._on_session_change:
+            try:
+                func()
+            except Exception as err:
+                _LOGGER.error("Error calling session change function %s: %s", func, err)
+
+    def export_session(self) -> dict[str, Any] | None:
+        """Return the login session so it can be persisted."""
+        if (
+            self._seq is None
+            or self._stok is None
+            or self._cookie is None
+            or self._password_encryptor is None
+            or self._sign_encryptor is None
+        ):
+            return None
+        # Large ints are stored as hex strings since JSON encoders may not
+        # support integers wider than 64 bits.
+        return {
+            "host": self._host,
+            "username": self._username,
+            "stok": self._stok,
+            "cookie": self._cookie,
+            "seq": self._seq,
+            "aes_key": self._aes_key,
+            "aes_iv": self._aes_iv,
+            "password_key": [
+                format(self._password_encryptor.n, "x"),
+                format(self._password_encryptor.e, "x"),
+            ],
+            "sign_key": [
+                format(self._sign_encryptor.n, "x"),
+                format(self._sign_encryptor.e, "x"),
+            ],
+        }
+
+    def restore_session(self, data: dict[str, Any] | None) -> bool:
+        """
+        Restore a login session saved by export_session.
+
+        The session is used as is for the next request. If the router rejects it,
+        all restored values are dropped and a full login is done.
+        """
+        if not data:
+            return False
+        host = data.get("host")
+        if host != self._host and host != "https://" + self._host.removeprefix(
+            "http://"
+        ):
+            _LOGGER.debug("Ignoring saved session for a different host")
+            return False
+        if data.get("username") != self._username:
+            _LOGGER.debug("Ignoring saved session for a different user")
+            return False
+
+        try:
+            password_encryptor = RsaEncryptor(
+                int(data["password_key"][0], 16), int(data["password_key"][1], 16)
+            )
+            sign_encryptor = RsaEncryptor(
+                int(data["sign_key"][0], 16), int(data["sign_key"][1], 16)
+            )
+            aes_key = int(data["aes_key"])
+            aes_iv = int(data["aes_iv"])
+            seq = int(data["seq"])
+            stok = str(data["stok"])
+            cookie = str(data["cookie"])
+        except (KeyError, IndexError, TypeError, ValueError) as err:
+            _LOGGER.debug("Ignoring invalid saved session: %s", err)
+            return False
+
+        self._host = host
+        self._aes_key = aes_key
+        self._aes_iv = aes_iv
+        self._aes_codec = AesCodec(
+            str(aes_key).encode("utf-8"), str(aes_iv).encode("utf-8")
+        )
+        self._set_password_encryptor(password_encryptor)
+        self._sign_encryptor = sign_encryptor
+        self._seq = seq
+        self._stok = stok
+        self._cookie = cookie
+        self._encoded_payload_cache.clear()
+        self._session_restored = True
+        # The real age is unknown, so count it from now
+        self._session_started_at = time.monotonic()
+        _LOGGER.debug("Restored saved login session")
+        return True
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Return non-sensitive API state."""
+        return {
+            "connections": {
+                "created": self._connections_created,
+                "reused": self._connections_reused,
+            },
+            "latency": {
+                context: tracker.as_dict(self._timeout_seconds)
+                for context, tracker in self._latency_trackers.items()
+            },
+            "hedged_requests": self._hedged_request_count,
+            "circuit_breaker": self._circuit_breaker.as_dict(),
+            "scheduler": self._scheduler.get_diagnostics(),
+            "session": {
+                "age_seconds": (
+                    time.monotonic() - self._session_started_at
+                    if self._session_started_at is not None
+                    else None
+                ),
+                "expected_lifetime_seconds": self._get_expected_session_lifetime(),
+                "renewals": self._session_renewals,
+                "lifetime_histogram": {
+                    (
+                        f"<={SESSION_LIFETIME_BUCKET_MINUTES[index]}m"
+                        if index < len(SESSION_LIFETIME_BUCKET_MINUTES)
+                        else f">{SESSION_LIFETIME_BUCKET_MINUTES[-1]}m"
+                    ): count
+                    for index, count in enumerate(self._session_lifetime_histogram)
+                },
+            },
+        }
+
+    def _expire_session(self, stok: str | None):
+        """
+        Record the lifetime of a session the router rejected and clear it.
+
+        stok is the session the rejected request was sent with. Parallel requests
+        sent with the same session all fail, and only the first one may clear it
+        so a session logged in since is kept.
+        """
+        if stok != self._stok:
+            _LOGGER.debug("Rejected session was already replaced")
+            return
+        if self._session_started_at is not None and not self._session_restored:
+            lifetime = time.monotonic() - self._session_started_at
+            _LOGGER.debug("Session expired after %.0fs", lifetime)
+            minutes = lifetime / 60
+            bucket = 0
+            while (
+                bucket < len(SESSION_LIFETIME_BUCKET_MINUTES)
+                and minutes > SESSION_LIFETIME_BUCKET_MINUTES[bucket]
+            ):
+                bucket += 1
+            self._session_lifetime_histogram[bucket] += 1
+            if lifetime >= SESSION_LIFETIME_MIN_SECONDS:
+                self._session_lifetimes.append(lifetime)
+        self.clear_auth()
+
+    def _get_expected_session_lifetime(self) -> float | None:
+        if not self._session_lifetimes:
+            return None
+        return statistics.median(self._session_lifetimes)
+
+    async def async_renew_session_if_needed(self, horizon_seconds: float) -> bool:
+        """
+        Log in again if the session is expected to expire within horizon_seconds.
+
+        Meant to be called in the idle gap after a poll with the time until the
+        next poll, so the next poll does not have to pay for the login.
+        """
+        expected_lifetime = self._get_expected_session_lifetime()
+        if (
+            expected_lifetime is None
+            or self._session_started_at is None
+            or self._circuit_breaker.state != STATE_CLOSED
+        ):
+            return False
+        age = time.monotonic() - self._session_started_at
+        if age + horizon_seconds < expected_lifetime * SESSION_RENEW_LIFETIME_FRACTION:
+            return False
+
+        stok = self._stok
+        # The login slot is exclusive, so no request is using the old session
+        # while it is replaced
+        async with self._scheduler.async_slot(PRIORITY_RENEWAL, ENDPOINT_LOGIN):
+            # Another request may have logged in while waiting for the slot
+            if stok is None or self._stok != stok:
+                return False
+            _LOGGER.debug(
+                "Renewing session age=%.0fs expected_lifetime=%.0fs",
+                age,
+                expected_lifetime,
+            )
+            self.clear_auth()
+            await self.async_login()
+            self._session_renewals += 1
+            return True
+
+    def _clear_auth_if_current(self, stok: str | None) -> None:
+        """Clear auth if stok, the session a request was sent with, is current."""
+        if stok != self._stok:
+            _LOGGER.debug("Session was already replaced, keeping auth")
+            return
+        self.clear_auth()
+
     def clear_auth(self):
         _LOGGER.debug("clear_auth")
         self._seq = None
         self._stok = None
         self._cookie = None
+        self._session_started_at = None
+        self._encoded_payload_cache.clear()
+        if self._session_restored:
+            # The restored keys may be stale too, so do a full login
+            self._session_restored = False
+            self._aes_key = None
+            self._aes_iv = None
+            self._aes_codec = None
+            self._set_password_encryptor(None)
+            self._sign_encryptor = None
 
     def _decrypt_data(self, context: str, data: str):
         if data == "":
-            self.clear_auth()
             message = f"{context} data is empty"
             raise EmptyDataException(message)
 
         try:
-            data_decoded = base64.b64decode(data)
-            data_decrypted = aes_decrypt(
-                self._aes_key_bytes, self._aes_iv_bytes, data_decoded
-            )
-            # Remove the PKCS #7 padding
-            num_padding_bytes = int(data_decrypted[-1])
-            data_decrypted = data_decrypted[:-num_padding_bytes].decode()
+            data_decrypted = self._aes_codec.decrypt(base64.b64decode(data))
+            # json.loads parses the UTF-8 bytes directly without an extra str copy
             data_json = json.loads(data_decrypted)
             return data_json
         except Exception as err:
@@ -591,8 +1363,19 @@ class TplinkDecoApi:
             raise err
 
     async def _async_call_with_retry(
-        self, func, *args, timeout_error_retries: int | None = None
+        self,
+        priority: int,
+        endpoint: str,
+        func,
+        *args,
+        timeout_error_retries: int | None = None,
     ):
+        """
+        Call func with re-login and timeout retries.
+
+        A scheduler slot is held per attempt rather than for the whole retry loop,
+        so higher priority requests can run between retries.
+        """
         relogin_retried = False
         timeout_retries = 0
         max_timeout_retries = (
@@ -602,7 +1385,12 @@ class TplinkDecoApi:
         )
         while True:
             try:
-                return await func(*args)
+                async with self._scheduler.async_slot(priority, endpoint):
+                    await self._async_check_circuit()
+                    result = await func(*args)
+                # Any restored session is confirmed valid now
+                self._session_restored = False
+                return result
             except (EmptyDataException, ForbiddenException) as err:
                 if relogin_retried:
                     # Reached max relogin retries
@@ -13,6 +13,7 @@ from .const import SIGNAL_DECO_ADDED
 from .coordinator import TpLinkDeco
 from .coordinator import TplinkDecoUpdateCoordinator
 from .device import create_device_info
+from .entity import ChangeGatedEntity
 
 
 async def async_setup_entry(
@@ -56,7 +57,9 @@ async def async_setup_entry(
     )
 
 
-class TplinkDecoInternetOnlineBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class TplinkDecoInternetOnlineBinarySensor(
+    ChangeGatedEntity, CoordinatorEntity, BinarySensorEntity
+):
     """TP-Link Deco internet online binary sensor."""
 
     _attr_has_entity_name = True
@@ -68,7 +71,7 @@ class TplinkDecoInternetOnlineBinarySensor(CoordinatorEntity, BinarySensorEntity
         coordinator_decos: TplinkDecoUpdateCoordinator,
         deco_mac: str,
     ) -> None:
-        super().__init__(coordinator_decos)
+        super().__init__(coordinator_decos, deco_mac)
         self._deco_mac = deco_mac
         self._attr_unique_id = f"{deco_mac}_internet_online"
 
@@ -108,7 +111,9 @@ class TplinkDecoInternetOnlineBinarySensor(CoordinatorEntity, BinarySensorEntity
         )
 
 
-class TplinkDecoOnlineBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class TplinkDecoOnlineBinarySensor(
+    ChangeGatedEntity, CoordinatorEntity, BinarySensorEntity
+):
     """TP-Link Deco online (mesh/backhaul) status."""
 
     _attr_has_entity_name = True
@@ -116,7 +121,7 @@ class TplinkDecoOnlineBinarySensor(CoordinatorEntity, BinarySensorEntity):
     _attr_entity_category = EntityCategory.DIAGNOSTIC
 
     def __init__(self, coordinator_decos, deco_mac):
-        super().__init__(coordinator_decos)
+        super().__init__(coordinator_decos, deco_mac)
         self._deco_mac = deco_mac
         self._attr_unique_id = f"{deco_mac}_online"
 
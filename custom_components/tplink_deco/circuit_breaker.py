@@ -0,0 +1,117 @@
+"""TP-Link Deco circuit breaker."""
+
+import logging
+import random
+import time
+from typing import Any
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Consecutive connection or timeout failures before requests are short circuited
+CIRCUIT_FAILURE_THRESHOLD = 3
+# The probe delay doubles for every failed probe, up to the maximum
+CIRCUIT_BACKOFF_BASE_SECONDS = 10
+CIRCUIT_BACKOFF_MAX_SECONDS = 300
+
+
+class CircuitBreaker:
+    """
+    Stops requests to an unreachable host.
+
+    Opens after failure_threshold consecutive failures. While open, requests are
+    refused until the next probe time, which backs off exponentially with jitter.
+    Once a probe is due the breaker goes half open and lets a single request
+    through. Any success closes the breaker and a failed probe opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        backoff_base_seconds: float = CIRCUIT_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = CIRCUIT_BACKOFF_MAX_SECONDS,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self._failed_probes = 0
+        self._opened_at = None
+        self._next_probe_at = None
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == STATE_CLOSED:
+            return True
+        now = time.monotonic()
+        if now < self._next_probe_at:
+            return False
+        # Let one probe through. If its outcome is never recorded, e.g. because it
+        # was cancelled, another probe is allowed after the next backoff.
+        self.state = STATE_HALF_OPEN
+        self._next_probe_at = now + self._get_backoff()
+        return True
+
+    def get_retry_seconds(self) -> float:
+        """Return the seconds until the next probe is allowed."""
+        if self.state == STATE_CLOSED:
+            return 0
+        return max(0, self._next_probe_at - time.monotonic())
+
+    def record_success(self) -> None:
+        if self.state != STATE_CLOSED:
+            _LOGGER.info(
+                "Deco reachable again after %.0fs, resuming requests",
+                time.monotonic() - self._opened_at,
+            )
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._failed_probes = 0
+        self._opened_at = None
+        self._next_probe_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == STATE_CLOSED:
+            if self.consecutive_failures < self.failure_threshold:
+                return
+            self.open_count += 1
+            self._opened_at = time.monotonic()
+        elif self.state == STATE_OPEN:
+            # Requests sent before the breaker opened failing, not a probe
+            return
+        else:
+            self._failed_probes += 1
+        self.state = STATE_OPEN
+        self._next_probe_at = time.monotonic() + self._get_backoff()
+        _LOGGER.warning(
+            "Deco unreachable after %d consecutive failures, pausing requests for %.0fs",
+            self.consecutive_failures,
+            self.get_retry_seconds(),
+        )
+
+    def _get_backoff(self) -> float:
+        backoff = min(
+            self.backoff_max_seconds,
+            self.backoff_base_seconds * 2**self._failed_probes,
+        )
+        # Equal jitter keeps at least half the backoff while spreading out probes
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_count": self.open_count,
+            "open_seconds": (
+                time.monotonic() - self._opened_at
+                if self._opened_at is not None
+                else None
+            ),
+            "retry_in_seconds": self.get_retry_seconds(),
+        }
@@ -0,0 +1,148 @@
+"""TP-Link Deco client query strategy selection."""
+
+import logging
+from typing import Any
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# One client list query per deco, which tells which deco each client is on
+STRATEGY_PER_DECO = "per_deco"
+# One client list query for the whole mesh
+STRATEGY_GLOBAL = "global"
+
+COST_EWMA_WEIGHT = 0.3
+# Each strategy that is not in use is retried after this many refreshes
+PROBE_INTERVAL_REFRESHES = 20
+# Another strategy must be this much cheaper to switch to it, to avoid flapping
+SWITCH_COST_RATIO = 0.8
+# Keeps the cost of a strategy that always fails finite
+MIN_SUCCESS_RATE = 0.05
+
+
+class QueryStrategyStats:
+    """Latency and success rate of one client query strategy."""
+
+    def __init__(self, last_refresh: int = 0) -> None:
+        self.attempts = 0
+        self.failures = 0
+        self.last_success = True
+        self.ewma_seconds = None
+        self.success_rate = 1.0
+        self.last_refresh = last_refresh
+
+    def record(self, seconds: float, success: bool) -> None:
+        self.attempts += 1
+        self.last_success = success
+        if not success:
+            self.failures += 1
+        if self.ewma_seconds is None:
+            self.ewma_seconds = seconds
+        else:
+            self.ewma_seconds += COST_EWMA_WEIGHT * (seconds - self.ewma_seconds)
+        self.success_rate += COST_EWMA_WEIGHT * (
+            (1.0 if success else 0.0) - self.success_rate
+        )
+
+    @property
+    def cost(self) -> float | None:
+        """Return the expected seconds spent per successful refresh."""
+        if self.ewma_seconds is None:
+            return None
+        return self.ewma_seconds / max(MIN_SUCCESS_RATE, self.success_rate)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "ewma_seconds": self.ewma_seconds,
+            "success_rate": self.success_rate,
+            "cost": self.cost,
+        }
+
+
+class ClientQueryCostModel:
+    """
+    Picks the cheapest client query strategy.
+
+    Time spent on a strategy, including failed attempts, is divided by its success
+    rate to get the expected cost of a successful refresh. Strategies not in use
+    are probed every PROBE_INTERVAL_REFRESHES refreshes so their costs stay
+    current.
+
+    Strategies in fallback_only give less accurate results. They are not probed
+    and are only switched to while the default strategy fails, until a probe of
+    the default strategy succeeds.
+    """
+
+    def __init__(self, strategies: tuple[str, ...], default: str) -> None:
+        self.default = default
+        self.current = default
+        self.stats = {strategy: QueryStrategyStats() for strategy in strategies}
+        self.fallback_only: frozenset[str] = frozenset()
+        self._refreshes = 0
+
+    def _is_default_failing(self) -> bool:
+        return not self.stats[self.default].last_success
+
+    def choose(self) -> str:
+        """Return the strategy to use for the next refresh."""
+        self._refreshes += 1
+        if self.current in self.fallback_only and not self._is_default_failing():
+            self.current = self.default
+        for strategy, stats in self.stats.items():
+            if (
+                strategy != self.current
+                and strategy not in self.fallback_only
+                and self._refreshes - stats.last_refresh >= PROBE_INTERVAL_REFRESHES
+            ):
+                _LOGGER.debug("Probing %s client query", strategy)
+                return strategy
+        return self.current
+
+    def get_fallback(self, strategy: str) -> str:
+        """Return the strategy to try after strategy failed."""
+        if strategy != self.current:
+            return self.current
+        return min(
+            (other for other in self.stats if other != strategy),
+            key=lambda other: self.stats[other].cost or 0,
+        )
+
+    def record(self, strategy: str, seconds: float, success: bool) -> None:
+        """Record the outcome of a query and switch strategy if another is cheaper."""
+        stats = self.stats[strategy]
+        stats.record(seconds, success)
+        stats.last_refresh = self._refreshes
+
+        if self.current in self.fallback_only and not self._is_default_failing():
+            _LOGGER.debug("Switching client query back to %s", self.default)
+            self.current = self.default
+        current_cost = self.stats[self.current].cost
+        if current_cost is None:
+            return
+        for other, other_stats in self.stats.items():
+            other_cost = other_stats.cost
+            if (
+                other != self.current
+                and other_cost is not None
+                and other_cost < current_cost * SWITCH_COST_RATIO
+                and (other not in self.fallback_only or self._is_default_failing())
+            ):
+                _LOGGER.debug(
+                    "Switching client query from %s (cost %.2fs) to %s (cost %.2fs)",
+                    self.current,
+                    current_cost,
+                    other,
+                    other_cost,
+                )
+                self.current = other
+                current_cost = other_cost
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "current": self.current,
+            "fallback_only": sorted(self.fallback_only),
+            "strategies": {
+                strategy: stats.as_dict() for strategy, stats in self.stats.items()
+            },
+        }
@@ -19,20 +19,41 @@ from homeassistant.helpers import selector
 import voluptuous as vol
 
 from .__init__ import async_create_and_refresh_coordinators
+from .const import CONF_ADAPTIVE_CLIENT_INTERVAL
+from .const import CONF_CLIENT_MAX_INTERVAL
+from .const import CONF_CLIENT_MIN_INTERVAL
 from .const import CONF_CLIENT_POSTFIX
 from .const import CONF_CLIENT_PREFIX
+from .const import CONF_CLIENT_QUERY_CONCURRENCY
+from .const import CONF_CLIENT_QUERY_SHARD_SIZE
+from .const import CONF_CLIENT_RETENTION_DAYS
+from .const import CONF_CLIENT_TRAFFIC_SENSORS
 from .const import CONF_DECO_POSTFIX
 from .const import CONF_DECO_PREFIX
+from .const import CONF_DEVICE_LIST_INTERVAL
+from .const import CONF_HEDGE_REQUESTS
+from .const import CONF_MAX_CLIENTS
+from .const import CONF_PERFORMANCE_INTERVAL
 from .const import CONF_TIMEOUT_ERROR_RETRIES
 from .const import CONF_TIMEOUT_SECONDS
+from .const import CONF_TOP_CLIENTS_COUNT
 from .const import CONF_VERIFY_SSL
 from .const import COORDINATOR_CLIENTS_KEY
 from .const import COORDINATOR_DECOS_KEY
+from .const import DEFAULT_CLIENT_MAX_INTERVAL
+from .const import DEFAULT_CLIENT_MIN_INTERVAL
+from .const import DEFAULT_CLIENT_QUERY_CONCURRENCY
+from .const import DEFAULT_CLIENT_QUERY_SHARD_SIZE
+from .const import DEFAULT_CLIENT_RETENTION_DAYS
 from .const import DEFAULT_CONSIDER_HOME
 from .const import DEFAULT_DECO_POSTFIX
+from .const import DEFAULT_DEVICE_LIST_INTERVAL
+from .const import DEFAULT_MAX_CLIENTS
+from .const import DEFAULT_PERFORMANCE_INTERVAL
 from .const import DEFAULT_SCAN_INTERVAL
 from .const import DEFAULT_TIMEOUT_ERROR_RETRIES
 from .const import DEFAULT_TIMEOUT_SECONDS
+from .const import DEFAULT_TOP_CLIENTS_COUNT
 from .const import DOMAIN
 from .exceptions import TimeoutException
 
@@ -98,6 +119,48 @@ def _get_schema(data: dict[str:Any]):
                 CONF_CONSIDER_HOME,
                 default=data.get(CONF_CONSIDER_HOME, DEFAULT_CONSIDER_HOME),
             ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_CLIENT_RETENTION_DAYS,
+                default=data.get(
+                    CONF_CLIENT_RETENTION_DAYS, DEFAULT_CLIENT_RETENTION_DAYS
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_MAX_CLIENTS,
+                default=data.get(CONF_MAX_CLIENTS, DEFAULT_MAX_CLIENTS),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_CLIENT_TRAFFIC_SENSORS,
+                default=data.get(CONF_CLIENT_TRAFFIC_SENSORS, False),
+            ): bool,
+            vol.Required(
+                CONF_TOP_CLIENTS_COUNT,
+                default=data.get(CONF_TOP_CLIENTS_COUNT, DEFAULT_TOP_CLIENTS_COUNT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0, max=50)),
+            vol.Required(
+                CONF_DEVICE_LIST_INTERVAL,
+                default=data.get(
+                    CONF_DEVICE_LIST_INTERVAL, DEFAULT_DEVICE_LIST_INTERVAL
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_PERFORMANCE_INTERVAL,
+                default=data.get(
+                    CONF_PERFORMANCE_INTERVAL, DEFAULT_PERFORMANCE_INTERVAL
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Required(
+                CONF_ADAPTIVE_CLIENT_INTERVAL,
+                default=data.get(CONF_ADAPTIVE_CLIENT_INTERVAL, False),
+            ): bool,
+            vol.Required(
+                CONF_CLIENT_MIN_INTERVAL,
+                default=data.get(CONF_CLIENT_MIN_INTERVAL, DEFAULT_CLIENT_MIN_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+            vol.Required(
+                CONF_CLIENT_MAX_INTERVAL,
+                default=data.get(CONF_CLIENT_MAX_INTERVAL, DEFAULT_CLIENT_MAX_INTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5)),
             vol.Required(
                 CONF_TIMEOUT_ERROR_RETRIES,
                 default=data.get(
@@ -108,10 +171,26 @@ def _get_schema(data: dict[str:Any]):
                 CONF_TIMEOUT_SECONDS,
                 default=data.get(CONF_TIMEOUT_SECONDS, DEFAULT_TIMEOUT_SECONDS),
             ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+            vol.Required(
+                CONF_CLIENT_QUERY_CONCURRENCY,
+                default=data.get(
+                    CONF_CLIENT_QUERY_CONCURRENCY, DEFAULT_CLIENT_QUERY_CONCURRENCY
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+            vol.Required(
+                CONF_CLIENT_QUERY_SHARD_SIZE,
+                default=data.get(
+                    CONF_CLIENT_QUERY_SHARD_SIZE, DEFAULT_CLIENT_QUERY_SHARD_SIZE
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
             vol.Required(
                 CONF_VERIFY_SSL,
                 default=data.get(CONF_VERIFY_SSL, True),
             ): bool,
+            vol.Required(
+                CONF_HEDGE_REQUESTS,
+                default=data.get(CONF_HEDGE_REQUESTS, False),
+            ): bool,
             vol.Optional(
                 CONF_CLIENT_PREFIX,
                 description={"suggested_value": data.get(CONF_CLIENT_PREFIX, "")},
@@ -158,6 +237,7 @@ async def _async_test_credentials(hass: HomeAssistant, data: dict[str:Any]):
             coordinators[COORDINATOR_DECOS_KEY].async_shutdown(),
             coordinators[COORDINATOR_CLIENTS_KEY].async_shutdown(),
         )
+        await coordinators[COORDINATOR_DECOS_KEY].api.async_close()
         return {}
     except TimeoutException:
         return {"base": "timeout_connect"}
@@ -10,11 +10,29 @@ DOMAIN = "tplink_deco"
 COORDINATOR_CLIENTS_KEY = "clients"
 COORDINATOR_DECOS_KEY = "decos"
 
+DEFAULT_CLIENT_MAX_INTERVAL = 120
+DEFAULT_CLIENT_MIN_INTERVAL = 10
+DEFAULT_CLIENT_QUERY_CONCURRENCY = 1
+DEFAULT_CLIENT_QUERY_SHARD_SIZE = 0
+DEFAULT_CLIENT_RETENTION_DAYS = 0
 DEFAULT_CONSIDER_HOME = DEFAULT_CONSIDER_HOME_SPAN.total_seconds()
+DEFAULT_DEVICE_LIST_INTERVAL = 0
 DEFAULT_DECO_POSTFIX = "Deco"
+DEFAULT_MAX_CLIENTS = 0
+DEFAULT_PERFORMANCE_INTERVAL = 0
 DEFAULT_SCAN_INTERVAL = 30
 DEFAULT_TIMEOUT_ERROR_RETRIES = 1
 DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_TOP_CLIENTS_COUNT = 5
+
+# Last seen times only matter to the nearest day, so they are saved rarely
+CLIENTS_SAVE_DELAY_SECONDS = 15 * 60
+CLIENTS_STORAGE_KEY = f"{DOMAIN}.{{entry_id}}.clients"
+CLIENTS_STORAGE_VERSION = 1
+SESSION_SAVE_DELAY_SECONDS = 10
+SESSION_STORAGE_KEY = f"{DOMAIN}.{{entry_id}}.session"
+SESSION_STORAGE_VERSION = 1
+STORES_KEY = "stores"
 
 DEVICE_TYPE_CLIENT = "client"
 DEVICE_TYPE_DECO = "deco"
@@ -28,25 +46,44 @@ ATTR_DECO_MAC = "deco_mac"
 ATTR_DEVICE_MODEL = "device_model"
 ATTR_DEVICE_TYPE = "device_type"
 ATTR_DOWN_KILOBYTES_PER_S = "down_kilobytes_per_s"
+ATTR_DOWN_KILOBYTES_PER_S_AVERAGE = "down_kilobytes_per_s_average"
+ATTR_DOWN_KILOBYTES_PER_S_PEAK = "down_kilobytes_per_s_peak"
 ATTR_INTERFACE = "interface"
 ATTR_INTERNET_ONLINE = "internet_online"
 ATTR_MASTER = "master"
 ATTR_SIGNAL_BAND2_4 = "signal_band2_4"
 ATTR_SIGNAL_BAND5 = "signal_band5"
+ATTR_TOP_DOWN = "top_down"
+ATTR_TOP_UP = "top_up"
 ATTR_UP_KILOBYTES_PER_S = "up_kilobytes_per_s"
+ATTR_UP_KILOBYTES_PER_S_AVERAGE = "up_kilobytes_per_s_average"
+ATTR_UP_KILOBYTES_PER_S_PEAK = "up_kilobytes_per_s_peak"
 ATTR_UI_DEVICE_NAME = "ui_device_name"
 
 # Config
+CONF_ADAPTIVE_CLIENT_INTERVAL = "adaptive_client_interval"
+CONF_CLIENT_MAX_INTERVAL = "client_max_interval"
+CONF_CLIENT_MIN_INTERVAL = "client_min_interval"
 CONF_CLIENT_PREFIX = "client_prefix"
 CONF_CLIENT_POSTFIX = "client_postfix"
+CONF_CLIENT_QUERY_CONCURRENCY = "client_query_concurrency"
+CONF_CLIENT_QUERY_SHARD_SIZE = "client_query_shard_size"
+CONF_CLIENT_RETENTION_DAYS = "client_retention_days"
+CONF_CLIENT_TRAFFIC_SENSORS = "client_traffic_sensors"
 CONF_DECO_PREFIX = "deco_prefix"
 CONF_DECO_POSTFIX = "deco_postfix"
+CONF_DEVICE_LIST_INTERVAL = "device_list_interval"
+CONF_HEDGE_REQUESTS = "hedge_requests"
+CONF_MAX_CLIENTS = "max_clients"
+CONF_PERFORMANCE_INTERVAL = "performance_interval"
 CONF_TIMEOUT_ERROR_RETRIES = "timeout_error_retries"
 CONF_TIMEOUT_SECONDS = "timeout_seconds"
+CONF_TOP_CLIENTS_COUNT = "top_clients_count"
 CONF_VERIFY_SSL = "verify_ssl"
 
 # Signals
 SIGNAL_CLIENT_ADDED = f"{DOMAIN}-client-added"
+SIGNAL_CLIENTS_REMOVED = f"{DOMAIN}-clients-removed"
 SIGNAL_DECO_ADDED = f"{DOMAIN}-deco-added"
 
 # Services
@@ -1,33 +1,64 @@
 """TP-Link Deco Coordinator"""
 
+import asyncio
+from collections import deque
 from collections.abc import Callable
 from datetime import datetime
 from datetime import timedelta
+import heapq
 import ipaddress
 import logging
+from operator import attrgetter
+import sys
+import time
 from typing import Any
 
 import aiohttp
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.components.device_tracker.const import (
+    DOMAIN as DEVICE_TRACKER_DOMAIN,
+)
+from homeassistant.components.sensor.const import DOMAIN as SENSOR_DOMAIN
 from homeassistant.core import CALLBACK_TYPE
 from homeassistant.core import HomeAssistant
 from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import entity_registry
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from .api import TplinkDecoApi
 from .api import normalize_name
+from .client_query import STRATEGY_GLOBAL
+from .client_query import STRATEGY_PER_DECO
+from .client_query import ClientQueryCostModel
 from .const import DOMAIN
 from .const import SIGNAL_CLIENT_ADDED
+from .const import SIGNAL_CLIENTS_REMOVED
 from .const import SIGNAL_DECO_ADDED
+from .exceptions import CircuitOpenException
 from .exceptions import LoginForbiddenException
 from .exceptions import LoginInvalidException
 from .exceptions import TimeoutException
+from .throughput import ThroughputHistory
+from .throughput import TrafficCounter
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
+# Adaptive client polling stays at the minimum interval while any of the last
+# few refreshes had activity, and otherwise backs off towards the maximum.
+ADAPTIVE_ACTIVITY_REFRESHES = 3
+ADAPTIVE_BACKOFF_FACTOR = 1.5
+# Client fields that change when a client joins, leaves or roams
+ACTIVITY_CLIENT_FIELDS = {"online", "deco_mac"}
+
+# Deco coordinator polls with their own intervals
+POLL_DEVICE_LIST = "device_list"
+POLL_PERFORMANCE = "performance"
+
 
 def bytes_to_bits(bytes_count):
     return bytes_count / 8 if bytes_count is not None else bytes_count
@@ -46,16 +77,117 @@ def snake_case_to_title_space(str):
     return " ".join([w.title() for w in str.split("_")])
 
 
+def intern_str(value):
+    """Intern strings repeated across many devices, like models and interfaces."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 async def async_call_and_propagate_config_error(func, *args, **kwargs):
     try:
         return await func(*args, **kwargs)
     except (LoginForbiddenException, LoginInvalidException) as err:
         raise ConfigEntryAuthFailed from err
+    except CircuitOpenException as err:
+        raise UpdateFailed(str(err)) from err
+
+
+class ChangeSet:
+    """Macs added, removed and changed by a refresh, with the changed fields."""
+
+    def __init__(
+        self,
+        added: set[str] | None = None,
+        removed: set[str] | None = None,
+        changed: dict[str, set[str]] | None = None,
+    ) -> None:
+        self.added = set() if added is None else added
+        self.removed = set() if removed is None else removed
+        self.changed = {} if changed is None else changed
+
+    @property
+    def macs(self) -> set[str]:
+        """Return all macs affected by the refresh."""
+        return self.added | self.removed | self.changed.keys()
+
+    def __repr__(self) -> str:
+        return (
+            f"ChangeSet(added={len(self.added)}, removed={len(self.removed)},"
+            f" changed={len(self.changed)})"
+        )
+
+
+def changed_fields(fields: tuple[str, ...], old: tuple, new: tuple) -> set[str]:
+    """Return the fields whose values differ between two snapshots."""
+    return {
+        field
+        for field, old_value, new_value in zip(fields, old, new)
+        if old_value != new_value
+    }
+
+
+class ChangeSetUpdateCoordinator(DataUpdateCoordinator):
+    """
+    Coordinator that only wakes the listeners affected by a refresh.
+
+    Listeners registered with a mac as their context are only called when that
+    mac is in the refresh's change set. Listeners without a context are always
+    called, and everyone is called when the change set is unknown or the
+    availability of the coordinator changed.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.changes: ChangeSet | None = None
+        self._last_notified_update_success = None
+        super().__init__(*args, **kwargs)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners affected by the last refresh."""
+        changes = self.changes
+        if (
+            changes is None
+            or not self.last_update_success
+            or self._last_notified_update_success is not True
+        ):
+            self._last_notified_update_success = self.last_update_success
+            super().async_update_listeners()
+            return
+
+        macs = changes.macs
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in macs:
+                update_callback()
 
 
 class TpLinkDeco:
     """Class to manage TP-Link Deco device."""
 
+    # Fields entities read, used to detect which decos changed in a refresh
+    FIELDS = (
+        "hw_version",
+        "sw_version",
+        "device_model",
+        "name",
+        "ip_address",
+        "online",
+        "internet_online",
+        "master",
+        "connection_type",
+        "interface",
+        "bssid_band2_4",
+        "bssid_band5",
+        "signal_band2_4",
+        "signal_band5",
+        "backhaul_speed",
+        "backhaul_max_speed",
+        "cpu_usage",
+        "cpu_usage_raw",
+        "mem_usage",
+        "mem_usage_raw",
+    )
+    # Slots avoid a dict per instance, which adds up on large meshes
+    __slots__ = ("mac",) + FIELDS
+
     def __init__(self, mac: str) -> None:
         self.mac = mac
 
@@ -81,13 +213,17 @@ class TpLinkDeco:
         self.mem_usage = None
         self.mem_usage_raw = None
 
+    def snapshot(self) -> tuple:
+        """Return the values of FIELDS."""
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
     def update(
         self,
         data: dict[str, Any],
     ) -> None:
-        self.hw_version = data.get("hardware_ver")
-        self.sw_version = data.get("software_ver")
-        self.device_model = data.get("device_model")
+        self.hw_version = intern_str(data.get("hardware_ver"))
+        self.sw_version = intern_str(data.get("software_ver"))
+        self.device_model = intern_str(data.get("device_model"))
 
         self.name = normalize_name(
             data.get("custom_nickname")
@@ -104,7 +240,7 @@ class TpLinkDeco:
         else:
             self.internet_online = bool(inet)
         self.master = data.get("role") == "master"
-        self.connection_type = data.get("connection_type")
+        self.connection_type = intern_str(data.get("connection_type"))
         self.bssid_band2_4 = data.get("bssid_2g")
         self.bssid_band5 = data.get("bssid_5g")
         signal_level = data.get("signal_level", {})
@@ -117,6 +253,31 @@ class TpLinkDeco:
 class TpLinkDecoClient:
     """Class to manage TP-Link Deco Client."""
 
+    # Fields entities read, used to detect which clients changed in a refresh.
+    # last_activity changes on every refresh for online clients so is excluded,
+    # as are the speed averages and peaks, which change as their window slides.
+    FIELDS = (
+        "name",
+        "ip_address",
+        "online",
+        "connection_type",
+        "interface",
+        "down_kilobytes_per_s",
+        "up_kilobytes_per_s",
+        "down_kilobytes_total",
+        "up_kilobytes_total",
+        "deco_mac",
+    )
+    __slots__ = (
+        "mac",
+        "last_activity",
+        "throughput",
+        "down_kilobytes_per_s_average",
+        "up_kilobytes_per_s_average",
+        "down_kilobytes_per_s_peak",
+        "up_kilobytes_per_s_peak",
+    ) + FIELDS
+
     def __init__(self, mac: str) -> None:
         self.mac = mac
         self.name = None
@@ -126,8 +287,21 @@ class TpLinkDecoClient:
         self.interface = None
         self.down_kilobytes_per_s = 0
         self.up_kilobytes_per_s = 0
+        self.down_kilobytes_per_s_average = None
+        self.up_kilobytes_per_s_average = None
+        self.down_kilobytes_per_s_peak = None
+        self.up_kilobytes_per_s_peak = None
+        # Kilobytes transferred since startup
+        self.down_kilobytes_total = 0.0
+        self.up_kilobytes_total = 0.0
         self.deco_mac = None
         self.last_activity = None
+        # Allocated once the client is seen, not for clients restored at startup
+        self.throughput: ThroughputHistory | None = None
+
+    def snapshot(self) -> tuple:
+        """Return the values of FIELDS."""
+        return tuple(getattr(self, field) for field in self.FIELDS)
 
     def update(
         self,
@@ -135,16 +309,90 @@ class TpLinkDecoClient:
         deco_mac: str,
         utc_point_in_time: datetime,
     ) -> None:
-        self.deco_mac = deco_mac
+        self.deco_mac = intern_str(deco_mac)
         self.name = normalize_name(data.get("name"))
         self.ip_address = filter_invalid_ip(data.get("ip"))
         self.online = data.get("online")
-        self.connection_type = data.get("connection_type")
-        self.interface = data.get("interface")
+        self.connection_type = intern_str(data.get("connection_type"))
+        self.interface = intern_str(data.get("interface"))
         self.down_kilobytes_per_s = bytes_to_bits(data.get("down_speed", 0))
         self.up_kilobytes_per_s = bytes_to_bits(data.get("up_speed", 0))
         self.last_activity = utc_point_in_time
 
+        if self.throughput is None:
+            self.throughput = ThroughputHistory()
+        down_kilobytes, up_kilobytes = self.throughput.record(
+            utc_point_in_time.timestamp(),
+            self.down_kilobytes_per_s,
+            self.up_kilobytes_per_s,
+        )
+        self.down_kilobytes_total += down_kilobytes
+        self.up_kilobytes_total += up_kilobytes
+        down_average, up_average = self.throughput.average
+        self.down_kilobytes_per_s_average = round(down_average, 2)
+        self.up_kilobytes_per_s_average = round(up_average, 2)
+        down_peak, up_peak = self.throughput.peak
+        self.down_kilobytes_per_s_peak = round(down_peak, 2)
+        self.up_kilobytes_per_s_peak = round(up_peak, 2)
+
+
+class TpLinkDecoClientAggregate:
+    """Totals over the clients of one deco, or of all decos."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.online_count = 0
+        self.down_kilobytes_per_s = 0.0
+        self.up_kilobytes_per_s = 0.0
+        self.connection_type_counts: dict[str, int] = {}
+
+    def add(self, client: TpLinkDecoClient) -> None:
+        self.count += 1
+        if client.online:
+            self.online_count += 1
+        self.down_kilobytes_per_s += client.down_kilobytes_per_s
+        self.up_kilobytes_per_s += client.up_kilobytes_per_s
+        connection_type = client.connection_type
+        if connection_type is not None:
+            self.connection_type_counts[connection_type] = (
+                self.connection_type_counts.get(connection_type, 0) + 1
+            )
+
+
+def aggregate_clients(
+    clients: dict[str, TpLinkDecoClient],
+) -> dict[str | None, TpLinkDecoClientAggregate]:
+    """Return client totals keyed by deco mac, and by None for all clients."""
+    total = TpLinkDecoClientAggregate()
+    aggregates = {None: total}
+    for client in clients.values():
+        total.add(client)
+        aggregate = aggregates.get(client.deco_mac)
+        if aggregate is None:
+            aggregate = aggregates[client.deco_mac] = TpLinkDecoClientAggregate()
+        aggregate.add(client)
+    return aggregates
+
+
+def get_top_clients(
+    clients: dict[str, TpLinkDecoClient], count: int
+) -> dict[str, list[TpLinkDecoClient]]:
+    """Return the online clients with the highest down and up speeds, fastest first."""
+    if count <= 0:
+        return {"down": [], "up": []}
+    online_clients = [client for client in clients.values() if client.online]
+    return {
+        direction: heapq.nlargest(
+            count,
+            (client for client in online_clients if getattr(client, attribute)),
+            key=attrgetter(attribute),
+        )
+        for direction, attribute in (
+            ("down", "down_kilobytes_per_s"),
+            ("up", "up_kilobytes_per_s"),
+        )
+    }
+
 
 class TpLinkDecoData:
     """Class for coordinator data."""
@@ -158,7 +406,7 @@ class TpLinkDecoData:
         self.decos = {} if decos is None else decos
 
 
-class TplinkDecoUpdateCoordinator(DataUpdateCoordinator):
+class TplinkDecoUpdateCoordinator(ChangeSetUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
     def __init__(
@@ -168,10 +416,17 @@ class TplinkDecoUpdateCoordinator(DataUpdateCoordinator):
         config_entry: ConfigEntry,
         update_interval: timedelta = None,
         data: TpLinkDecoData = None,
+        device_list_interval: timedelta = None,
+        performance_interval: timedelta = None,
     ) -> None:
         """Initialize."""
         self.api = api
         self._on_close: list[Callable] = []
+        # The device list and performance are only fetched on the update ticks
+        # where their own interval has passed. None fetches on every tick.
+        self.device_list_interval = device_list_interval
+        self.performance_interval = performance_interval
+        self._last_polled: dict[str, float] = {}
 
         super().__init__(
             hass,
@@ -189,44 +444,60 @@ class TplinkDecoUpdateCoordinator(DataUpdateCoordinator):
         """Update data via api."""
         if self.paused:
             _LOGGER.debug("Deco polling is paused")
+            self.changes = ChangeSet()
             return self.data
+        self.changes = None
 
-        new_decos = await async_call_and_propagate_config_error(
-            self.api.async_list_devices
-        )
+        now = time.monotonic()
+        polled = []
+        new_decos = None
+        if self._is_poll_due(POLL_DEVICE_LIST, self.device_list_interval, now):
+            new_decos = await async_call_and_propagate_config_error(
+                self.api.async_list_devices
+            )
+            polled.append(POLL_DEVICE_LIST)
 
-        performance_data = await async_call_and_propagate_config_error(
-            self.api.async_get_performance
-        )
+        performance_data = None
+        if self._is_poll_due(POLL_PERFORMANCE, self.performance_interval, now):
+            performance_data = await async_call_and_propagate_config_error(
+                self.api.async_get_performance
+            )
+            polled.append(POLL_PERFORMANCE)
 
         old_decos = self.data.decos
+        old_master_deco = self.data.master_deco
+        snapshots = {mac: deco.snapshot() for mac, deco in old_decos.items()}
         master_deco = None
         deco_added = False
         decos = {}
-        for new_deco in new_decos:
-            mac = new_deco["mac"]
-            deco = old_decos.get(mac)
-            if deco is None:
-                deco_added = True
-                deco = TpLinkDeco(mac)
-                _LOGGER.debug("_async_update_data: Found new deco mac=%s", deco.mac)
-            deco.update(new_deco)
-            decos[mac] = deco
-            if deco.master:
-                master_deco = deco
-
-        for mac, old_deco in old_decos.items():
-            if mac not in decos:
-                _LOGGER.debug(
-                    "_async_update_data: Deco mac=%s not returned by API, marking offline",
-                    mac,
-                )
-                old_deco.online = False
-                old_deco.internet_online = False
-                decos[mac] = old_deco
+        if new_decos is None:
+            decos = old_decos
+            master_deco = old_master_deco
+        else:
+            for new_deco in new_decos:
+                mac = new_deco["mac"]
+                deco = old_decos.get(mac)
+                if deco is None:
+                    deco_added = True
+                    deco = TpLinkDeco(mac)
+                    _LOGGER.debug("_async_update_data: Found new deco mac=%s", deco.mac)
+                deco.update(new_deco)
+                decos[mac] = deco
+                if deco.master:
+                    master_deco = deco
+
+            for mac, old_deco in old_decos.items():
+                if mac not in decos:
+                    _LOGGER.debug(
+                        "_async_update_data: Deco mac=%s not returned by API, marking offline",
+                        mac,
+                    )
+                    old_deco.online = False
+                    old_deco.internet_online = False
+                    decos[mac] = old_deco
 
         # Zet globale performance data op de master Deco
-        result = performance_data.get("result", {})
+        result = {} if performance_data is None else performance_data.get("result", {})
         if master_deco is not None:
             cpu_raw = result.get("cpu_usage")
             mem_raw = result.get("mem_usage")
@@ -253,11 +524,45 @@ class TplinkDecoUpdateCoordinator(DataUpdateCoordinator):
                 else:
                     master_deco.mem_usage = round(mem_percent, 1)
 
+        changes = ChangeSet()
+        for mac, deco in decos.items():
+            snapshot = snapshots.get(mac)
+            if snapshot is None:
+                changes.added.add(mac)
+                continue
+            fields = changed_fields(TpLinkDeco.FIELDS, snapshot, deco.snapshot())
+            if fields:
+                changes.changed[mac] = fields
+        changes.removed = old_decos.keys() - decos.keys()
+        if master_deco is not old_master_deco or (
+            master_deco is not None
+            and "name" in changes.changed.get(master_deco.mac, ())
+        ):
+            # Deco entities show the master deco
+            for mac in decos:
+                changes.changed.setdefault(mac, set()).add("master_deco")
+        _LOGGER.debug("_async_update_data: Deco changes %s", changes)
+        self.changes = changes
+        for poll in polled:
+            self._last_polled[poll] = now
+
         if deco_added:
             async_dispatcher_send(self.hass, SIGNAL_DECO_ADDED)
 
         return TpLinkDecoData(master_deco, decos)
 
+    def _is_poll_due(self, poll: str, interval: timedelta | None, now: float) -> bool:
+        last_polled = self._last_polled.get(poll)
+        if interval is None or last_polled is None:
+            return True
+        # Allow for tick jitter so a poll is not pushed back by a whole tick
+        tolerance = (
+            self.update_interval.total_seconds() / 2
+            if self.update_interval is not None
+            else 0
+        )
+        return now - last_polled >= interval.total_seconds() - tolerance
+
     @callback
     def on_close(self, func: CALLBACK_TYPE) -> None:
         """Add a function to call when coordinator is closed."""
@@ -273,7 +578,7 @@ class TplinkDecoUpdateCoordinator(DataUpdateCoordinator):
         self._on_close.clear()
 
 
-class TplinkDecoClientUpdateCoordinator(DataUpdateCoordinator):
+class TplinkDecoClientUpdateCoordinator(ChangeSetUpdateCoordinator):
     """Class to manage fetching data from the API."""
 
     def __init__(
@@ -285,12 +590,40 @@ class TplinkDecoClientUpdateCoordinator(DataUpdateCoordinator):
         consider_home_seconds: int,
         update_interval: timedelta = None,
         data: dict[str:TpLinkDecoClient] = None,
+        min_update_interval: timedelta = None,
+        max_update_interval: timedelta = None,
+        shard_size: int = 0,
+        client_retention: timedelta = None,
+        max_clients: int = 0,
+        top_clients_count: int = 0,
     ) -> None:
         """Initialize."""
         self.api = api
         self._deco_update_coordinator = deco_update_coordinator
+        # Clients unseen for longer than the retention are removed, and the
+        # least recently seen clients over max_clients. 0 keeps all clients.
+        self.client_retention = client_retention
+        self.max_clients = max_clients
+        # Kilobytes transferred by clients since startup, keyed by the deco the
+        # clients were on and by None for all decos
+        self.traffic: dict[str | None, TrafficCounter] = {None: TrafficCounter()}
+        self.top_clients_count = top_clients_count
+        # Per-deco queries are limited to this many decos per update, rotating
+        # through the decos. 0 queries all decos.
+        self.shard_size = shard_size
+        self._shard_offset = 0
+        # When the clients of each deco were last listed
+        self.deco_clients_listed_at: dict[str, datetime] = {}
         self._consider_home_seconds = consider_home_seconds
         self._on_close: list[Callable] = []
+        # The update interval adapts to client activity if both bounds are set
+        self.min_update_interval = min_update_interval
+        self.max_update_interval = max_update_interval
+        self._recent_activity = deque(maxlen=ADAPTIVE_ACTIVITY_REFRESHES)
+        if self.is_adaptive and update_interval is not None:
+            update_interval = min(
+                max_update_interval, max(min_update_interval, update_interval)
+            )
 
         super().__init__(
             hass,
@@ -301,70 +634,306 @@ class TplinkDecoClientUpdateCoordinator(DataUpdateCoordinator):
         )
         # Must happen after super().__init__
         self.data = {} if data is None else data
+        # Client totals of the last refresh, so sensors don't each scan all clients
+        self.aggregates = aggregate_clients(self.data)
+        self.top_clients = get_top_clients(self.data, self.top_clients_count)
         self.has_successful_refresh = False
-        self._use_global_client_query = False
+        self.client_query_cost_model = ClientQueryCostModel(
+            (STRATEGY_PER_DECO, STRATEGY_GLOBAL), STRATEGY_PER_DECO
+        )
+        # Deco names as of the last refresh, since client entities show them
+        self._deco_names: dict[str, str] = {}
+        # Clients listed as connected by the last refresh
+        self._present_client_macs: set[str] = set()
+        # Heap of (away time, mac) for clients no longer listed. Entries are
+        # skipped if the client came back, so there is one timer for the heap.
+        self._expiry_heap: list[tuple[datetime, str]] = []
+        self._expiry_timer_at = None
+        self._cancel_expiry_timer = None
+        self._on_close.append(self._async_cancel_expiry_timer)
+        # Seconds the last client list query for each deco took
+        self.deco_client_list_seconds: dict[str, float] = {}
 
     async def _async_list_clients_per_deco(self, deco_macs: list[str]):
-        """List clients sequentially without per-node timeout retries."""
-        responses = []
-        for deco_mac in deco_macs:
-            responses.append(
-                await async_call_and_propagate_config_error(
-                    self.api.async_list_clients,
-                    deco_mac,
-                    timeout_error_retries=0,
-                )
-            )
+        """
+        List clients for each deco without per-node timeout retries.
+
+        All queries are started at once and the API runs as many in parallel as
+        its max concurrent requests allows. Responses are in deco_macs order, and
+        if any query fails the first error in that order is raised once all
+        queries are done.
+        """
+        responses = await asyncio.gather(
+            *(self._async_list_deco_clients(deco_mac) for deco_mac in deco_macs),
+            return_exceptions=True,
+        )
+        for response in responses:
+            if isinstance(response, BaseException):
+                raise response
         return responses
 
+    async def _async_list_deco_clients(self, deco_mac: str):
+        clients = await async_call_and_propagate_config_error(
+            self.api.async_list_clients,
+            deco_mac,
+            timeout_error_retries=0,
+            # Some firmware never answers per-deco queries, which must not pause
+            # the global query used as the fallback
+            count_timeouts=False,
+        )
+        # Timed by the API once the request has a slot, so queueing behind the
+        # other decos' queries is not counted
+        seconds = self.api.get_client_list_seconds(deco_mac)
+        if seconds is not None:
+            self.deco_client_list_seconds[deco_mac] = seconds
+        return clients
+
     async def _async_list_clients_global(self):
         """List all clients once without timeout retries."""
         master_deco = self._deco_update_coordinator.data.master_deco
         deco_macs = [master_deco.mac if master_deco is not None else "default"]
+        # The global list holds every client on the mesh, so stream it. On a
+        # mesh it is only the fallback, per-deco lists hold a single deco's
+        # clients and are not streamed so they can be hedged.
         responses = [
             await async_call_and_propagate_config_error(
                 self.api.async_list_clients,
                 timeout_error_retries=0,
+                stream=True,
             )
         ]
         return deco_macs, responses
 
+    def export_last_seen(self) -> dict[str, str]:
+        """Return when each client was last seen, for client retention."""
+        return {
+            mac: client.last_activity.isoformat()
+            for mac, client in (self.data or {}).items()
+            if client.last_activity is not None
+        }
+
+    def _get_expiry_time(self, client: TpLinkDecoClient) -> datetime:
+        return client.last_activity + timedelta(seconds=self._consider_home_seconds)
+
+    def _schedule_client_expiry(
+        self, client: TpLinkDecoClient, utc_point_in_time: datetime
+    ) -> None:
+        """Mark client away once consider home has passed since it was last seen."""
+        if client.last_activity is None:
+            client.online = False
+            return
+        expiry_time = self._get_expiry_time(client)
+        if expiry_time <= utc_point_in_time:
+            client.online = False
+        else:
+            heapq.heappush(self._expiry_heap, (expiry_time, client.mac))
+
+    @callback
+    def _async_schedule_expiry_timer(self) -> None:
+        """Set the timer for the earliest client expiry."""
+        expiry_time = self._expiry_heap[0][0] if self._expiry_heap else None
+        if expiry_time == self._expiry_timer_at:
+            return
+        self._async_cancel_expiry_timer()
+        if expiry_time is not None:
+            self._expiry_timer_at = expiry_time
+            self._cancel_expiry_timer = async_track_point_in_utc_time(
+                self.hass, self._async_handle_expiry, expiry_time
+            )
+
+    @callback
+    def _async_cancel_expiry_timer(self) -> None:
+        if self._cancel_expiry_timer is not None:
+            self._cancel_expiry_timer()
+            self._cancel_expiry_timer = None
+        self._expiry_timer_at = None
+
+    @callback
+    def _async_handle_expiry(self, utc_point_in_time: datetime) -> None:
+        """Mark clients away whose consider home time has passed."""
+        self._cancel_expiry_timer = None
+        self._expiry_timer_at = None
+        changed = {}
+        while self._expiry_heap and self._expiry_heap[0][0] <= utc_point_in_time:
+            expiry_time, mac = heapq.heappop(self._expiry_heap)
+            client = self.data.get(mac)
+            if (
+                client is None
+                or not client.online
+                or mac in self._present_client_macs
+                # Seen again since this entry was added
+                or self._get_expiry_time(client) != expiry_time
+            ):
+                continue
+            _LOGGER.debug("_async_handle_expiry: Client mac=%s is away", mac)
+            client.online = False
+            changed[mac] = {"online"}
+
+        if changed:
+            self.changes = ChangeSet(changed=changed)
+            self.aggregates = aggregate_clients(self.data)
+            self.top_clients = get_top_clients(self.data, self.top_clients_count)
+            self.async_update_listeners()
+        self._async_schedule_expiry_timer()
+
+    def _count_traffic(
+        self, deco_mac: str, down_kilobytes: float, up_kilobytes: float
+    ) -> None:
+        if not down_kilobytes and not up_kilobytes:
+            return
+        counter = self.traffic.get(deco_mac)
+        if counter is None:
+            counter = self.traffic[deco_mac] = TrafficCounter()
+        counter.add(down_kilobytes, up_kilobytes)
+        self.traffic[None].add(down_kilobytes, up_kilobytes)
+
+    def _evict_clients(
+        self, clients: dict[str, TpLinkDecoClient], utc_point_in_time: datetime
+    ) -> set[str]:
+        """Remove clients past the retention limits and return their macs."""
+        # Present clients would be added back by the next update
+        candidates = [
+            client
+            for mac, client in clients.items()
+            if mac not in self._present_client_macs
+        ]
+        evicted_macs = set()
+        if self.client_retention is not None:
+            cutoff = utc_point_in_time - self.client_retention
+            evicted_macs.update(
+                client.mac
+                for client in candidates
+                if client.last_activity is not None and client.last_activity < cutoff
+            )
+        excess = len(clients) - len(evicted_macs) - self.max_clients
+        if self.max_clients > 0 and excess > 0:
+            # Least recently seen first, clients never seen before the others
+            evicted_macs.update(
+                client.mac
+                for client in heapq.nsmallest(
+                    excess,
+                    (client for client in candidates if client.mac not in evicted_macs),
+                    key=lambda client: (
+                        client.last_activity is not None,
+                        client.last_activity,
+                    ),
+                )
+            )
+        if not evicted_macs:
+            return evicted_macs
+
+        _LOGGER.debug("_evict_clients: Removing %d clients", len(evicted_macs))
+        for mac in evicted_macs:
+            del clients[mac]
+        expiry_heap = [item for item in self._expiry_heap if item[1] in clients]
+        if len(expiry_heap) != len(self._expiry_heap):
+            heapq.heapify(expiry_heap)
+            self._expiry_heap = expiry_heap
+        return evicted_macs
+
+    @callback
+    def _async_remove_client_entities(self, macs: set[str]) -> None:
+        """Remove the entities of evicted clients from the entity registry."""
+        async_dispatcher_send(self.hass, SIGNAL_CLIENTS_REMOVED, macs)
+        if self.config_entry is None:
+            return
+        registry = entity_registry.async_get(self.hass)
+        for entry in entity_registry.async_entries_for_config_entry(
+            registry, self.config_entry.entry_id
+        ):
+            # Client entity unique ids are the mac, optionally with a suffix
+            if (
+                entry.domain in (DEVICE_TRACKER_DOMAIN, SENSOR_DOMAIN)
+                and entry.unique_id.partition("_")[0] in macs
+            ):
+                registry.async_remove(entry.entity_id)
+
+    def _get_next_shard(self, deco_macs: list[str]) -> list[str]:
+        """Return the decos to list clients for on this update."""
+        if self.shard_size <= 0 or len(deco_macs) <= self.shard_size:
+            return deco_macs
+        deco_macs = sorted(deco_macs)
+        start = self._shard_offset % len(deco_macs)
+        self._shard_offset = start + self.shard_size
+        shard = deco_macs[start : start + self.shard_size]
+        # Wrap around to the first decos
+        return shard + deco_macs[: self.shard_size - len(shard)]
+
+    async def _async_list_clients_with_strategy(
+        self, strategy: str, deco_macs: list[str]
+    ):
+        """List clients with strategy and record its cost."""
+        start = time.monotonic()
+        try:
+            if strategy == STRATEGY_GLOBAL:
+                result = await self._async_list_clients_global()
+            else:
+                result = deco_macs, await self._async_list_clients_per_deco(deco_macs)
+        except (aiohttp.ClientResponseError, TimeoutException):
+            self.client_query_cost_model.record(
+                strategy, time.monotonic() - start, False
+            )
+            raise
+        self.client_query_cost_model.record(strategy, time.monotonic() - start, True)
+        return result
+
     async def _async_update_data(self):
         """Update data via api."""
         if self._deco_update_coordinator.paused:
             _LOGGER.debug("Deo client polling is paused")
+            self.changes = ChangeSet()
             return self.data
+        self.changes = None
 
         if len(self._deco_update_coordinator.data.decos) == 0:
             return
 
         old_clients = self.data
-        clients = {}
+        snapshots = {mac: client.snapshot() for mac, client in old_clients.items()}
+        # Clients no longer listed are kept until they are removed
+        clients = dict(old_clients)
+        listed_client_macs = set()
         client_added = False
         # List clients for all decos if _deco_update_coordinator is not provided
-        deco_macs = list(self._deco_update_coordinator.data.decos)
+        all_deco_macs = list(self._deco_update_coordinator.data.decos)
+        shard_deco_macs = self._get_next_shard(all_deco_macs)
         utc_point_in_time = dt_util.utcnow()
 
-        if self._use_global_client_query:
-            deco_macs, deco_client_responses = await self._async_list_clients_global()
-        else:
-            try:
-                deco_client_responses = await self._async_list_clients_per_deco(
-                    deco_macs
-                )
-            except (aiohttp.ClientResponseError, TimeoutException) as err:
-                if isinstance(err, aiohttp.ClientResponseError) and err.status < 500:
-                    raise
-                # Some Deco firmware times out or returns 5xx for per-node
-                # client queries. Use one global query for subsequent updates.
-                self._use_global_client_query = True
-                _LOGGER.debug(
-                    "Per-node client_list failed (%s); switching to global query",
-                    err,
-                )
-                deco_macs, deco_client_responses = (
-                    await self._async_list_clients_global()
-                )
+        # The global query reports every client on the master deco, so it only
+        # returns the same data as per-deco queries when there is a single deco.
+        # On a mesh it is only used while per-deco queries fail.
+        is_mesh = len(all_deco_macs) > 1
+        self.client_query_cost_model.fallback_only = (
+            frozenset({STRATEGY_GLOBAL}) if is_mesh else frozenset()
+        )
+        strategy = self.client_query_cost_model.choose()
+        try:
+            deco_macs, deco_client_responses = (
+                await self._async_list_clients_with_strategy(strategy, shard_deco_macs)
+            )
+        except (aiohttp.ClientResponseError, TimeoutException) as err:
+            if isinstance(err, aiohttp.ClientResponseError) and err.status < 500:
+                raise
+            # Some Deco firmware times out or returns 5xx for per-node client
+            # queries, so fall back to the other strategy for this update.
+            fallback = self.client_query_cost_model.get_fallback(strategy)
+            _LOGGER.debug(
+                "%s client_list failed (%s); falling back to %s query",
+                strategy,
+                err,
+                fallback,
+            )
+            strategy = fallback
+            deco_macs, deco_client_responses = (
+                await self._async_list_clients_with_strategy(strategy, shard_deco_macs)
+            )
+        listed_deco_macs = (
+            all_deco_macs if strategy == STRATEGY_GLOBAL else shard_deco_macs
+        )
+        for deco_mac in listed_deco_macs:
+            self.deco_clients_listed_at[deco_mac] = utc_point_in_time
+        # Nothing is known about clients of decos that were not listed
+        unlisted_deco_macs = set(all_deco_macs).difference(listed_deco_macs)
 
         if len(deco_client_responses) > 0:
             # deco_macs is not subscriptable, must be iterated
@@ -378,27 +947,123 @@ class TplinkDecoClientUpdateCoordinator(DataUpdateCoordinator):
                         _LOGGER.debug(
                             "_async_update_data: Found new client mac=%s", client.mac
                         )
-                    client.update(deco_client, deco_mac, utc_point_in_time)
+                    client_deco_mac = deco_mac
+                    if (
+                        strategy == STRATEGY_GLOBAL
+                        and is_mesh
+                        and client.deco_mac is not None
+                    ):
+                        # Keep the deco the client was last listed on
+                        client_deco_mac = client.deco_mac
+                    down_kilobytes_total = client.down_kilobytes_total
+                    up_kilobytes_total = client.up_kilobytes_total
+                    client.update(deco_client, client_deco_mac, utc_point_in_time)
+                    self._count_traffic(
+                        client.deco_mac,
+                        client.down_kilobytes_total - down_kilobytes_total,
+                        client.up_kilobytes_total - up_kilobytes_total,
+                    )
                     clients[client_mac] = client
+                    listed_client_macs.add(client_mac)
 
-        # Copy over clients no longer online
-        for client in old_clients.values():
-            mac = client.mac
-            if mac not in clients:
-                clients[mac] = client
-                if client.last_activity is None:
-                    client.online = False
-                else:
-                    client.online = (
-                        utc_point_in_time - client.last_activity
-                    ).total_seconds() < self._consider_home_seconds
+        # Only clients that were present until now need to be checked. They are
+        # marked away by a timer once consider home has passed.
+        for mac in self._present_client_macs - listed_client_macs:
+            client = clients[mac]
+            if client.deco_mac in unlisted_deco_macs:
+                # Its deco was not listed so it may still be present
+                listed_client_macs.add(mac)
+                continue
+            self._schedule_client_expiry(client, utc_point_in_time)
+        self._present_client_macs = listed_client_macs
+        evicted_macs = self._evict_clients(clients, utc_point_in_time)
+        self._async_schedule_expiry_timer()
+
+        deco_names = {
+            mac: deco.name
+            for mac, deco in self._deco_update_coordinator.data.decos.items()
+        }
+        renamed_decos = {
+            mac
+            for mac, name in deco_names.items()
+            if self._deco_names.get(mac, name) != name
+        }
+        self._deco_names = deco_names
+
+        changes = ChangeSet()
+        for mac, client in clients.items():
+            snapshot = snapshots.get(mac)
+            if snapshot is None:
+                changes.added.add(mac)
+                continue
+            fields = changed_fields(
+                TpLinkDecoClient.FIELDS, snapshot, client.snapshot()
+            )
+            if client.deco_mac in renamed_decos:
+                fields.add("deco_name")
+            if fields:
+                changes.changed[mac] = fields
+        changes.removed = old_clients.keys() - clients.keys()
+        _LOGGER.debug("_async_update_data: Client changes %s", changes)
+        self.changes = changes
+        if self.is_adaptive and self.update_interval is not None:
+            self._adapt_update_interval(changes)
+        self.aggregates = aggregate_clients(clients)
+        self.top_clients = get_top_clients(clients, self.top_clients_count)
 
         if client_added:
             async_dispatcher_send(self.hass, SIGNAL_CLIENT_ADDED)
+        if evicted_macs:
+            self._async_remove_client_entities(evicted_macs)
 
         self.has_successful_refresh = True
+        if self.config_entry is not None and self.update_interval is not None:
+            # Renew the session in the idle gap before the next poll if it is
+            # about to expire, so polls do not pay for the login.
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_renew_session(self.update_interval.total_seconds()),
+                name="tplink_deco session renewal",
+            )
         return clients
 
+    @property
+    def is_adaptive(self) -> bool:
+        """Return whether the update interval adapts to client activity."""
+        return (
+            self.min_update_interval is not None
+            and self.max_update_interval is not None
+        )
+
+    def _adapt_update_interval(self, changes: ChangeSet) -> None:
+        """Poll faster after joins, leaves or roams and slower while stable."""
+        self._recent_activity.append(
+            bool(changes.added or changes.removed)
+            or any(
+                not fields.isdisjoint(ACTIVITY_CLIENT_FIELDS)
+                for fields in changes.changed.values()
+            )
+        )
+        if any(self._recent_activity):
+            update_interval = self.min_update_interval
+        else:
+            update_interval = min(
+                self.max_update_interval,
+                self.update_interval * ADAPTIVE_BACKOFF_FACTOR,
+            )
+        if update_interval != self.update_interval:
+            _LOGGER.debug(
+                "Client update interval changed to %.0fs",
+                update_interval.total_seconds(),
+            )
+            self.update_interval = update_interval
+
+    async def _async_renew_session(self, horizon_seconds: float) -> None:
+        try:
+            await self.api.async_renew_session_if_needed(horizon_seconds)
+        except Exception as err:
+            _LOGGER.debug("Session renewal failed: %s", err)
+
     @callback
     def on_close(self, func: CALLBACK_TYPE) -> None:
         """Add a function to call when coordinator is closed."""
@@ -24,12 +24,16 @@ from .const import ATTR_DECO_MAC
 from .const import ATTR_DEVICE_MODEL
 from .const import ATTR_DEVICE_TYPE
 from .const import ATTR_DOWN_KILOBYTES_PER_S
+from .const import ATTR_DOWN_KILOBYTES_PER_S_AVERAGE
+from .const import ATTR_DOWN_KILOBYTES_PER_S_PEAK
 from .const import ATTR_INTERFACE
 from .const import ATTR_INTERNET_ONLINE
 from .const import ATTR_MASTER
 from .const import ATTR_SIGNAL_BAND2_4
 from .const import ATTR_SIGNAL_BAND5
 from .const import ATTR_UP_KILOBYTES_PER_S
+from .const import ATTR_UP_KILOBYTES_PER_S_AVERAGE
+from .const import ATTR_UP_KILOBYTES_PER_S_PEAK
 from .const import CONF_CLIENT_POSTFIX
 from .const import CONF_CLIENT_PREFIX
 from .const import CONF_DECO_POSTFIX
@@ -40,12 +44,14 @@ from .const import DEVICE_TYPE_CLIENT
 from .const import DEVICE_TYPE_DECO
 from .const import DOMAIN
 from .const import SIGNAL_CLIENT_ADDED
+from .const import SIGNAL_CLIENTS_REMOVED
 from .const import SIGNAL_DECO_ADDED
 from .coordinator import TpLinkDeco
 from .coordinator import TpLinkDecoClient
 from .coordinator import TplinkDecoClientUpdateCoordinator
 from .coordinator import TplinkDecoUpdateCoordinator
 from .device import create_device_info
+from .entity import ChangeGatedEntity
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 ATTR_UI_DEVICE_NAME = "ui_device_name"
@@ -164,6 +170,11 @@ def _async_setup_clients(
         if new_entities:
             async_add_entities(new_entities)
 
+    @callback
+    def untrack_removed_clients(macs: set[str]):
+        """Forget removed clients so they are added again if they come back."""
+        tracked_clients.difference_update(macs)
+
     add_untracked_clients()
     coordinator_clients.on_close(
         coordinator_clients.async_add_listener(add_untracked_clients)
@@ -171,9 +182,14 @@ def _async_setup_clients(
     coordinator_clients.on_close(
         async_dispatcher_connect(hass, SIGNAL_CLIENT_ADDED, add_untracked_clients)
     )
+    coordinator_clients.on_close(
+        async_dispatcher_connect(hass, SIGNAL_CLIENTS_REMOVED, untrack_removed_clients)
+    )
 
 
-class TplinkDecoDeviceTracker(CoordinatorEntity, RestoreEntity, ScannerEntity):
+class TplinkDecoDeviceTracker(
+    ChangeGatedEntity, CoordinatorEntity, RestoreEntity, ScannerEntity
+):
     """TP Link Deco Entity."""
 
     def __init__(
@@ -205,7 +221,8 @@ class TplinkDecoDeviceTracker(CoordinatorEntity, RestoreEntity, ScannerEntity):
         self._attr_signal_band5 = None
 
         self._update_from_deco()
-        super().__init__(coordinator)
+        # Only woken when the coordinator reports this deco changed
+        super().__init__(coordinator, deco.mac)
 
     async def async_added_to_hass(self):
         """Run when entity about to be added."""
@@ -293,43 +310,46 @@ class TplinkDecoDeviceTracker(CoordinatorEntity, RestoreEntity, ScannerEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        if self._update_from_deco():
-            self.async_write_ha_state()
+        self._update_from_deco()
+        # Skipped if nothing changed
+        self.async_write_ha_state()
 
     def _update_from_deco(self) -> None:
-        """Update data from deco."""
-        changed = False
+        """Update data from deco. None values keep the last known value."""
         if self._deco.hw_version is not None:
             self._attr_hw_version = self._deco.hw_version
-            changed = True
         if self._deco.sw_version is not None:
             self._attr_sw_version = self._deco.sw_version
-            changed = True
         if self._deco.device_model is not None:
             self._attr_device_model = self._deco.device_model
-            changed = True
 
         if self._deco.ip_address is not None:
             self._attr_ip_address = self._deco.ip_address
-            changed = True
         if self._deco.name is not None:
             self._attr_name = _generate_name(
                 self._deco.name, self._deco_prefix, self._deco_postfix
             )
-            changed = True
         if self._deco.master is not None:
             self._attr_master = self._deco.master
-            changed = True
         if self._deco.connection_type is not None:
             self._attr_connection_type = self._deco.connection_type
-            changed = True
 
-        return changed
 
-
-class TplinkDecoClientDeviceTracker(CoordinatorEntity, RestoreEntity, ScannerEntity):
+class TplinkDecoClientDeviceTracker(
+    ChangeGatedEntity, CoordinatorEntity, RestoreEntity, ScannerEntity
+):
     """TP Link Deco Entity."""
 
+    # Change with nearly every update while the client is active
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_DOWN_KILOBYTES_PER_S_AVERAGE,
+            ATTR_UP_KILOBYTES_PER_S_AVERAGE,
+            ATTR_DOWN_KILOBYTES_PER_S_PEAK,
+            ATTR_UP_KILOBYTES_PER_S_PEAK,
+        }
+    )
+
     def __init__(
         self,
         coordinator_decos: TplinkDecoUpdateCoordinator,
@@ -350,7 +370,8 @@ class TplinkDecoClientDeviceTracker(CoordinatorEntity, RestoreEntity, ScannerEnt
         self._coordinator_decos = coordinator_decos
         self._mac_address = client.mac
         self._update_from_client()
-        super().__init__(coordinator_clients)
+        # Only woken when the coordinator reports this client changed
+        super().__init__(coordinator_clients, client.mac)
 
     async def async_added_to_hass(self):
         """Run when entity about to be added."""
@@ -406,6 +427,12 @@ class TplinkDecoClientDeviceTracker(CoordinatorEntity, RestoreEntity, ScannerEnt
             ATTR_INTERFACE: self._attr_interface,
             ATTR_DOWN_KILOBYTES_PER_S: self._client.down_kilobytes_per_s,
             ATTR_UP_KILOBYTES_PER_S: self._client.up_kilobytes_per_s,
+            ATTR_DOWN_KILOBYTES_PER_S_AVERAGE: (
+                self._client.down_kilobytes_per_s_average
+            ),
+            ATTR_UP_KILOBYTES_PER_S_AVERAGE: self._client.up_kilobytes_per_s_average,
+            ATTR_DOWN_KILOBYTES_PER_S_PEAK: self._client.down_kilobytes_per_s_peak,
+            ATTR_UP_KILOBYTES_PER_S_PEAK: self._client.up_kilobytes_per_s_peak,
             ATTR_DECO_DEVICE: None if deco is None else deco.name,
             ATTR_DECO_MAC: self._attr_deco_mac,
             ATTR_UI_DEVICE_NAME: self._attr_name,
@@ -425,27 +452,21 @@ class TplinkDecoClientDeviceTracker(CoordinatorEntity, RestoreEntity, ScannerEnt
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        if self._update_from_client():
-            self.async_write_ha_state()
+        self._update_from_client()
+        # Skipped if nothing changed
+        self.async_write_ha_state()
 
     def _update_from_client(self) -> None:
-        """Update data from client."""
-        changed = False
+        """Update data from client. None values keep the last known value."""
         if self._client.connection_type is not None:
             self._attr_connection_type = self._client.connection_type
-            changed = True
         if self._client.deco_mac is not None:
             self._attr_deco_mac = self._client.deco_mac
-            changed = True
         if self._client.interface is not None:
             self._attr_interface = self._client.interface
-            changed = True
         if self._client.ip_address is not None:
             self._attr_ip_address = self._client.ip_address
-            changed = True
         if self._client.name is not None:
             self._attr_name = _generate_name(
                 self._client.name, self._client_prefix, self._client_postfix
             )
-            changed = True
-        return changed
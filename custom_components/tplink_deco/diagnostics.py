@@ -1,6 +1,7 @@
 """Diagnostics support for TP-Link Deco."""
 
 from datetime import datetime
+from datetime import timedelta
 from typing import Any
 
 from homeassistant.components.diagnostics import async_redact_data
@@ -9,6 +10,7 @@ from homeassistant.const import CONF_HOST
 from homeassistant.const import CONF_PASSWORD
 from homeassistant.const import CONF_USERNAME
 from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
 
 from .const import COORDINATOR_CLIENTS_KEY
 from .const import COORDINATOR_DECOS_KEY
@@ -33,14 +35,15 @@ TO_REDACT = {
 }
 
 
+def _interval_seconds(interval: timedelta | None) -> float | None:
+    return interval.total_seconds() if interval is not None else None
+
+
 def _coordinator_diagnostics(coordinator) -> dict[str, Any]:
     """Return non-sensitive coordinator state."""
-    update_interval = coordinator.update_interval
     return {
         "last_update_success": coordinator.last_update_success,
-        "update_interval_seconds": (
-            update_interval.total_seconds() if update_interval is not None else None
-        ),
+        "update_interval_seconds": _interval_seconds(coordinator.update_interval),
     }
 
 
@@ -83,6 +86,9 @@ def _client_diagnostics(
         "down_kilobytes_per_s": client.down_kilobytes_per_s,
         "up_kilobytes_per_s": client.up_kilobytes_per_s,
         "last_activity": last_activity.isoformat() if last_activity else None,
+        "throughput": (
+            client.throughput.as_dict() if client.throughput is not None else None
+        ),
     }
 
 
@@ -99,6 +105,7 @@ async def async_get_config_entry_diagnostics(
     decos = sorted(deco_coordinator.data.decos.items())
     clients = sorted(client_coordinator.data.items())
     deco_ids = {mac: f"deco_{index}" for index, (mac, _) in enumerate(decos, 1)}
+    now = dt_util.utcnow()
 
     return {
         "config_entry": {
@@ -107,9 +114,16 @@ async def async_get_config_entry_diagnostics(
             "data": async_redact_data(config_entry.data, TO_REDACT),
             "options": async_redact_data(config_entry.options, TO_REDACT),
         },
+        "api": deco_coordinator.api.get_diagnostics(),
         "deco_coordinator": {
             **_coordinator_diagnostics(deco_coordinator),
             "paused": deco_coordinator.paused,
+            "device_list_interval_seconds": _interval_seconds(
+                deco_coordinator.device_list_interval
+            ),
+            "performance_interval_seconds": _interval_seconds(
+                deco_coordinator.performance_interval
+            ),
             "master_deco_id": (
                 deco_ids.get(deco_coordinator.data.master_deco.mac)
                 if deco_coordinator.data.master_deco is not None
@@ -119,6 +133,21 @@ async def async_get_config_entry_diagnostics(
         },
         "client_coordinator": {
             **_coordinator_diagnostics(client_coordinator),
+            "client_query": client_coordinator.client_query_cost_model.as_dict(),
+            "deco_clients_listed_seconds_ago": {
+                deco_ids[mac]: (now - listed_at).total_seconds()
+                for mac, listed_at in sorted(
+                    client_coordinator.deco_clients_listed_at.items()
+                )
+                if mac in deco_ids
+            },
+            "deco_client_list_seconds": {
+                deco_ids[mac]: seconds
+                for mac, seconds in sorted(
+                    client_coordinator.deco_client_list_seconds.items()
+                )
+                if mac in deco_ids
+            },
             "clients": [
                 _client_diagnostics(client, f"client_{index}", deco_ids)
                 for index, (_, client) in enumerate(clients, 1)
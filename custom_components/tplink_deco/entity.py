@@ -0,0 +1,33 @@
+"""TP-Link Deco."""
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+
+
+class ChangeGatedEntity(Entity):
+    """
+    Entity that skips state writes which would not change anything.
+
+    The state and attributes Home Assistant would write, including the friendly
+    name, device class and capabilities, are compared to the current state, so
+    polls that change nothing do not create state_reported events. They are only
+    calculated again when the write goes ahead. Must come before the other entity
+    classes in the bases.
+    """
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state to the state machine if it changed."""
+        if self.hass is None or self.force_update:
+            super().async_write_ha_state()
+            return
+
+        current = self.hass.states.get(self.entity_id)
+        if current is not None:
+            calculated = self._async_calculate_state()
+            if (
+                calculated.state == current.state
+                and calculated.attributes == current.attributes
+            ):
+                return
+        super().async_write_ha_state()
@@ -1,6 +1,16 @@
 """TPLink Deco Exceptions"""
 
 
+class CircuitOpenException(Exception):
+    """Requests are paused because the Deco is unreachable"""
+
+    def __init__(self, retry_seconds):
+        self.retry_seconds = retry_seconds
+        super().__init__(
+            f"Deco is unreachable. Retrying in {retry_seconds:.0f} seconds."
+        )
+
+
 class EmptyDataException(Exception):
     """Empty data exception"""
 
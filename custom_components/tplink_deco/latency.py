@@ -0,0 +1,72 @@
+"""TP-Link Deco request latency tracking."""
+
+from collections import deque
+import math
+from typing import Any
+
+LATENCY_EWMA_WEIGHT = 0.2
+LATENCY_SAMPLES = 50
+# Estimates are only used once there are enough samples to trust them
+LATENCY_MIN_SAMPLES = 5
+
+# Deadlines are the p99 latency times this multiplier, and never shorter than the
+# minimum so a burst of fast responses cannot make timeouts overly tight.
+DEADLINE_P99_MULTIPLIER = 3
+DEADLINE_MIN_SECONDS = 5
+
+# Hedged requests are sent once a request runs this far past its p99 latency
+HEDGE_P99_MULTIPLIER = 1.5
+
+
+class LatencyTracker:
+    """EWMA and high percentile estimate of the latency for one request context."""
+
+    def __init__(self) -> None:
+        self.ewma = None
+        self._samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        if self.ewma is None:
+            self.ewma = seconds
+        else:
+            self.ewma += LATENCY_EWMA_WEIGHT * (seconds - self.ewma)
+
+    def reset(self) -> None:
+        """Forget the estimates, e.g. after a timeout showed they were too low."""
+        self.ewma = None
+        self._samples.clear()
+
+    @property
+    def last(self) -> float | None:
+        """Return the latest latency, if any since the last reset."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, percent: float) -> float | None:
+        if len(self._samples) < LATENCY_MIN_SAMPLES:
+            return None
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, math.ceil(percent / 100 * len(samples)) - 1)
+        return samples[index]
+
+    def get_timeout(self, max_timeout: float) -> float:
+        """Return the deadline for the next request, capped at max_timeout."""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return max_timeout
+        return min(
+            max_timeout, max(DEADLINE_MIN_SECONDS, p99 * DEADLINE_P99_MULTIPLIER)
+        )
+
+    def get_hedge_delay(self) -> float | None:
+        """Return how long to wait before sending a hedged request, if known."""
+        p99 = self.percentile(99)
+        return None if p99 is None else p99 * HEDGE_P99_MULTIPLIER
+
+    def as_dict(self, max_timeout: float) -> dict[str, Any]:
+        return {
+            "samples": len(self._samples),
+            "ewma_seconds": self.ewma,
+            "p99_seconds": self.percentile(99),
+            "timeout_seconds": self.get_timeout(max_timeout),
+        }
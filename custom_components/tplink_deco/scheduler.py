@@ -0,0 +1,172 @@
+"""TP-Link Deco request scheduler."""
+
+import asyncio
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import logging
+import time
+from typing import Any
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_PRESENCE = 1
+PRIORITY_TELEMETRY = 2
+PRIORITY_RENEWAL = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_PRESENCE: "presence",
+    PRIORITY_TELEMETRY: "telemetry",
+    PRIORITY_RENEWAL: "renewal",
+}
+
+
+class QueueWaitStats:
+    """Queue wait time statistics for one priority class."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "average_seconds": (
+                self.total_seconds / self.count if self.count > 0 else None
+            ),
+            "max_seconds": self.max_seconds,
+            "last_seconds": self.last_seconds,
+        }
+
+
+class RequestScheduler:
+    """
+    Grants request slots in priority order.
+
+    At most max_concurrency requests run at once. Endpoints listed in
+    endpoint_concurrency are limited to their own count instead, which may be
+    higher, but only run together with requests of the same endpoint. Requests to
+    exclusive_endpoints wait until nothing else runs and block everything else.
+
+    Requests are served in priority order, and in arrival order within a
+    priority. A request that cannot run yet holds back the requests queued behind
+    it, so running requests drain to it instead of later requests taking their
+    slots.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        endpoint_concurrency: dict[str, int] | None = None,
+        exclusive_endpoints: frozenset[str] = frozenset(),
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.endpoint_concurrency = endpoint_concurrency or {}
+        self.exclusive_endpoints = exclusive_endpoints
+        self._active = 0
+        self._active_by_endpoint: dict[str, int] = {}
+        self._waiters: list[list] = []
+        self._counter = itertools.count()
+        self._wait_stats = {priority: QueueWaitStats() for priority in PRIORITY_NAMES}
+
+    @asynccontextmanager
+    async def async_slot(self, priority: int, endpoint: str):
+        """Wait for and hold a request slot for endpoint."""
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._counter), endpoint, future])
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted right before cancellation
+                self._release(endpoint)
+            else:
+                future.cancel()
+            raise
+
+        wait_seconds = time.monotonic() - start
+        self._wait_stats[priority].record(wait_seconds)
+        if wait_seconds > 1:
+            _LOGGER.debug(
+                "%s request waited %.1fs for a %s slot",
+                endpoint,
+                wait_seconds,
+                PRIORITY_NAMES.get(priority, priority),
+            )
+        try:
+            yield
+        finally:
+            self._release(endpoint)
+
+    @property
+    def peak_concurrency(self) -> int:
+        """Return the most requests that can run at once."""
+        return max([self.max_concurrency, *self.endpoint_concurrency.values()])
+
+    def _can_run(self, endpoint: str) -> bool:
+        if endpoint in self.exclusive_endpoints:
+            return self._active == 0
+        if any(
+            self._active_by_endpoint.get(exclusive_endpoint)
+            for exclusive_endpoint in self.exclusive_endpoints
+        ):
+            return False
+        limit = self.endpoint_concurrency.get(endpoint)
+        active_for_endpoint = self._active_by_endpoint.get(endpoint, 0)
+        if limit is None:
+            return self._active < self.max_concurrency
+        if active_for_endpoint >= limit:
+            return False
+        # Beyond max_concurrency the endpoint only shares with its own requests
+        return (
+            self._active < self.max_concurrency or active_for_endpoint == self._active
+        )
+
+    def _release(self, endpoint: str) -> None:
+        self._active -= 1
+        self._active_by_endpoint[endpoint] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiters in order until one cannot run."""
+        while self._waiters:
+            _, _, endpoint, future = self._waiters[0]
+            if future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_run(endpoint):
+                return
+            heapq.heappop(self._waiters)
+            self._active += 1
+            self._active_by_endpoint[endpoint] = (
+                self._active_by_endpoint.get(endpoint, 0) + 1
+            )
+            future.set_result(None)
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Return queue state and wait time statistics."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "endpoint_concurrency": self.endpoint_concurrency,
+            "active": self._active,
+            "queued": sum(1 for waiter in self._waiters if not waiter[3].done()),
+            "queue_wait": {
+                PRIORITY_NAMES[priority]: stats.as_dict()
+                for priority, stats in self._wait_stats.items()
+            },
+        }
@@ -8,6 +8,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import COORDINATOR_DECOS_KEY
 from .const import DOMAIN
 from .device import create_device_info
+from .entity import ChangeGatedEntity
 
 POLLING_INTERVAL_OPTIONS = ["10", "30", "60", "120"]
 
@@ -22,7 +23,7 @@ async def async_setup_entry(
     async_add_entities([DecoPollingIntervalSelect(hass, config_entry, coordinator)])
 
 
-class DecoPollingIntervalSelect(SelectEntity):
+class DecoPollingIntervalSelect(ChangeGatedEntity, SelectEntity):
     """Select entity to control Deco polling interval."""
 
     _attr_has_entity_name = True
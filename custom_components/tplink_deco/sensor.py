@@ -5,6 +5,7 @@ import logging
 from typing import Any
 from typing import Callable
 
+from homeassistant.components.sensor import RestoreSensor
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.sensor import SensorEntityDescription
 from homeassistant.components.sensor.const import SensorDeviceClass
@@ -12,20 +13,32 @@ from homeassistant.components.sensor.const import SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EntityCategory
 from homeassistant.const import UnitOfDataRate
+from homeassistant.const import UnitOfInformation
+from homeassistant.const import UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .const import ATTR_DECO_MAC
+from .const import ATTR_DOWN_KILOBYTES_PER_S
+from .const import ATTR_TOP_DOWN
+from .const import ATTR_TOP_UP
+from .const import ATTR_UP_KILOBYTES_PER_S
+from .const import CONF_CLIENT_TRAFFIC_SENSORS
 from .const import COORDINATOR_CLIENTS_KEY
 from .const import COORDINATOR_DECOS_KEY
 from .const import DOMAIN
+from .const import SIGNAL_CLIENT_ADDED
+from .const import SIGNAL_CLIENTS_REMOVED
 from .const import SIGNAL_DECO_ADDED
 from .coordinator import TpLinkDeco
+from .coordinator import TpLinkDecoClient
 from .coordinator import TplinkDecoClientUpdateCoordinator
 from .coordinator import TplinkDecoUpdateCoordinator
 from .device import create_device_info
+from .entity import ChangeGatedEntity
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
@@ -160,9 +173,42 @@ async def async_setup_entry(
                 "up_kilobytes_per_s",
                 deco,
             ),
+            TplinkDecoTrafficSensor(
+                coordinator_decos,
+                coordinator_clients,
+                f"{name_prefix} Downloaded",
+                f"{unique_id_prefix}_downloaded",
+                "down_kilobytes",
+                deco,
+            ),
+            TplinkDecoTrafficSensor(
+                coordinator_decos,
+                coordinator_clients,
+                f"{name_prefix} Uploaded",
+                f"{unique_id_prefix}_uploaded",
+                "up_kilobytes",
+                deco,
+            ),
         ]
 
-        if deco is not None:
+        if deco is None:
+            entities.append(
+                TplinkDecoClientUpdateIntervalSensor(
+                    coordinator_decos,
+                    coordinator_clients,
+                    f"{unique_id_prefix}_client_update_interval",
+                )
+            )
+            if coordinator_clients.top_clients_count > 0:
+                entities.append(
+                    TplinkDecoTopClientsSensor(
+                        coordinator_decos,
+                        coordinator_clients,
+                        f"{name_prefix} Top Clients",
+                        f"{unique_id_prefix}_top_clients",
+                    )
+                )
+        else:
             for description in DIAGNOSTIC_SENSOR_DESCRIPTIONS:
                 value = description.value_fn(deco)
 
@@ -239,8 +285,67 @@ async def async_setup_entry(
         async_dispatcher_connect(hass, SIGNAL_DECO_ADDED, add_untracked_deco_sensors)
     )
 
+    if entry.data.get(CONF_CLIENT_TRAFFIC_SENSORS, False):
+        _async_setup_client_traffic_sensors(
+            hass, async_add_entities, coordinator_decos, coordinator_clients
+        )
+
 
-class TplinkTotalClientDataRateSensor(CoordinatorEntity, SensorEntity):
+def _async_setup_client_traffic_sensors(
+    hass: HomeAssistant,
+    async_add_entities,
+    coordinator_decos: TplinkDecoUpdateCoordinator,
+    coordinator_clients: TplinkDecoClientUpdateCoordinator,
+):
+    tracked_clients = set()
+
+    @callback
+    def add_untracked_client_traffic_sensors():
+        """Add new traffic sensors for clients."""
+        new_entities = []
+
+        for mac, client in coordinator_clients.data.items():
+            if mac in tracked_clients:
+                continue
+
+            _LOGGER.debug(
+                "add_untracked_client_traffic_sensors: Adding client mac=%s", mac
+            )
+            new_entities.extend(
+                TplinkDecoClientTrafficSensor(
+                    coordinator_decos, coordinator_clients, client, direction
+                )
+                for direction in ("down", "up")
+            )
+            tracked_clients.add(mac)
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    @callback
+    def untrack_removed_client_traffic_sensors(macs: set[str]):
+        """Forget removed clients so they are added again if they come back."""
+        tracked_clients.difference_update(macs)
+
+    add_untracked_client_traffic_sensors()
+    coordinator_clients.on_close(
+        coordinator_clients.async_add_listener(add_untracked_client_traffic_sensors)
+    )
+    coordinator_clients.on_close(
+        async_dispatcher_connect(
+            hass, SIGNAL_CLIENT_ADDED, add_untracked_client_traffic_sensors
+        )
+    )
+    coordinator_clients.on_close(
+        async_dispatcher_connect(
+            hass, SIGNAL_CLIENTS_REMOVED, untrack_removed_client_traffic_sensors
+        )
+    )
+
+
+class TplinkTotalClientDataRateSensor(
+    ChangeGatedEntity, CoordinatorEntity, SensorEntity
+):
     """TP-Link total client data rate sensor entity."""
 
     def __init__(
@@ -283,14 +388,171 @@ class TplinkTotalClientDataRateSensor(CoordinatorEntity, SensorEntity):
 
     def _update_state(self) -> None:
         """Handle updated data from the coordinator."""
-        state = 0.0
-        for client in self.coordinator.data.values():
-            if self._deco is None or client.deco_mac == self._deco.mac:
-                state += getattr(client, self._client_attribute)
-        self._attr_native_value = state
+        aggregate = self.coordinator.aggregates.get(
+            None if self._deco is None else self._deco.mac
+        )
+        self._attr_native_value = (
+            0.0 if aggregate is None else getattr(aggregate, self._client_attribute)
+        )
+
+
+class TplinkDecoTrafficSensor(ChangeGatedEntity, CoordinatorEntity, RestoreSensor):
+    """TP-Link Deco data transferred by clients sensor entity."""
 
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.KILOBYTES
+    _attr_suggested_unit_of_measurement = UnitOfInformation.MEGABYTES
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
 
-class TplinkDecoClientCountSensor(CoordinatorEntity, SensorEntity):
+    def __init__(
+        self,
+        coordinator_decos: TplinkDecoUpdateCoordinator,
+        coordinator_clients: TplinkDecoClientUpdateCoordinator,
+        name: str,
+        unique_id: str,
+        traffic_attribute: str,
+        deco: TpLinkDeco | None,
+        context: str | None = None,
+    ) -> None:
+        self._coordinator_decos = coordinator_decos
+        self._traffic_attribute = traffic_attribute
+        self._deco = deco
+        # The coordinator counts from startup, so the restored total is added
+        self._offset = 0.0
+
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        super().__init__(coordinator_clients, context)
+        self._update_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Continue counting from the last total."""
+        await super().async_added_to_hass()
+        last_sensor_data = await self.async_get_last_sensor_data()
+        if last_sensor_data is not None and last_sensor_data.native_value is not None:
+            try:
+                last_value = float(last_sensor_data.native_value)
+            except ValueError:
+                last_value = None
+            if last_value is not None:
+                self._offset = last_value - self._get_kilobytes()
+        self._update_state()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        master_deco = self._coordinator_decos.data.master_deco
+        return create_device_info(self._deco or master_deco, master_deco)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_state()
+        self.async_write_ha_state()
+
+    def _get_kilobytes(self) -> float:
+        counter = self.coordinator.traffic.get(
+            None if self._deco is None else self._deco.mac
+        )
+        return 0.0 if counter is None else getattr(counter, self._traffic_attribute)
+
+    def _update_state(self) -> None:
+        self._attr_native_value = round(self._offset + self._get_kilobytes(), 1)
+
+
+class TplinkDecoClientTrafficSensor(TplinkDecoTrafficSensor):
+    """TP-Link Deco data transferred by a client sensor entity."""
+
+    def __init__(
+        self,
+        coordinator_decos: TplinkDecoUpdateCoordinator,
+        coordinator_clients: TplinkDecoClientUpdateCoordinator,
+        client: TpLinkDecoClient,
+        direction: str,
+    ) -> None:
+        self._client = client
+        self._name_suffix = "Downloaded" if direction == "down" else "Uploaded"
+        super().__init__(
+            coordinator_decos,
+            coordinator_clients,
+            None,
+            f"{client.mac}_{self._name_suffix.lower()}",
+            f"{direction}_kilobytes_total",
+            None,
+            # Only woken when the coordinator reports this client changed
+            client.mac,
+        )
+
+    @property
+    def name(self) -> str:
+        """Return the name of the sensor."""
+        return f"{self._client.name or self._client.mac} {self._name_suffix}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        deco = self._coordinator_decos.data.decos.get(self._client.deco_mac)
+        return create_device_info(deco, self._coordinator_decos.data.master_deco)
+
+    def _get_kilobytes(self) -> float:
+        return getattr(self._client, self._traffic_attribute)
+
+
+class TplinkDecoTopClientsSensor(ChangeGatedEntity, CoordinatorEntity, SensorEntity):
+    """TP-Link Deco clients with the highest data rates sensor entity."""
+
+    _attr_device_class = SensorDeviceClass.DATA_RATE
+    _attr_native_unit_of_measurement = UnitOfDataRate.KILOBYTES_PER_SECOND
+    _attr_icon = "mdi:podium"
+    # The rankings change on most refreshes and would bloat the database
+    _unrecorded_attributes = frozenset({ATTR_TOP_DOWN, ATTR_TOP_UP})
+
+    def __init__(
+        self,
+        coordinator_decos: TplinkDecoUpdateCoordinator,
+        coordinator_clients: TplinkDecoClientUpdateCoordinator,
+        name: str,
+        unique_id: str,
+    ) -> None:
+        self._coordinator_decos = coordinator_decos
+        self._attr_name = name
+        self._attr_unique_id = unique_id
+        super().__init__(coordinator_clients)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        master_deco = self._coordinator_decos.data.master_deco
+        return create_device_info(master_deco, master_deco)
+
+    @property
+    def native_value(self) -> float:
+        """Return the down data rate of the fastest client."""
+        top_down = self.coordinator.top_clients["down"]
+        return top_down[0].down_kilobytes_per_s if top_down else 0.0
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the ranked clients."""
+        return {
+            ATTR_TOP_DOWN: self._get_ranking("down"),
+            ATTR_TOP_UP: self._get_ranking("up"),
+        }
+
+    def _get_ranking(self, direction: str) -> list[dict[str, Any]]:
+        return [
+            {
+                "mac": client.mac,
+                "name": client.name,
+                ATTR_DECO_MAC: client.deco_mac,
+                ATTR_DOWN_KILOBYTES_PER_S: client.down_kilobytes_per_s,
+                ATTR_UP_KILOBYTES_PER_S: client.up_kilobytes_per_s,
+            }
+            for client in self.coordinator.top_clients[direction]
+        ]
+
+
+class TplinkDecoClientCountSensor(ChangeGatedEntity, CoordinatorEntity, SensorEntity):
     """TP-Link Deco connected client count sensor."""
 
     _attr_has_entity_name = True
@@ -333,14 +595,45 @@ class TplinkDecoClientCountSensor(CoordinatorEntity, SensorEntity):
 
     def _update_state(self) -> None:
         """Update sensor state."""
-        count = 0
-        for client in self.coordinator.data.values():
-            if client.deco_mac == self._deco_mac:
-                count += 1
-        self._attr_native_value = count
+        aggregate = self.coordinator.aggregates.get(self._deco_mac)
+        self._attr_native_value = 0 if aggregate is None else aggregate.count
+
+
+class TplinkDecoClientUpdateIntervalSensor(
+    ChangeGatedEntity, CoordinatorEntity, SensorEntity
+):
+    """TP-Link Deco effective client update interval sensor."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Client update interval"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator_decos: TplinkDecoUpdateCoordinator,
+        coordinator_clients: TplinkDecoClientUpdateCoordinator,
+        unique_id: str,
+    ) -> None:
+        self._coordinator_decos = coordinator_decos
+        self._attr_unique_id = unique_id
+        super().__init__(coordinator_clients)
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info."""
+        master_deco = self._coordinator_decos.data.master_deco
+        return create_device_info(master_deco, master_deco)
+
+    @property
+    def native_value(self) -> float | None:
+        update_interval = self.coordinator.update_interval
+        return None if update_interval is None else update_interval.total_seconds()
 
 
-class TplinkDecoDiagnosticSensor(CoordinatorEntity, SensorEntity):
+class TplinkDecoDiagnosticSensor(ChangeGatedEntity, CoordinatorEntity, SensorEntity):
     """TP-Link Deco diagnostic sensor entity."""
 
     entity_description: TplinkDecoDiagnosticSensorDescription
@@ -352,7 +645,7 @@ class TplinkDecoDiagnosticSensor(CoordinatorEntity, SensorEntity):
         deco_mac: str,
         description: TplinkDecoDiagnosticSensorDescription,
     ) -> None:
-        super().__init__(coordinator_decos)
+        super().__init__(coordinator_decos, deco_mac)
         self._deco_mac = deco_mac
         self.entity_description = description
         self._attr_unique_id = f"{deco_mac}_{description.key}"
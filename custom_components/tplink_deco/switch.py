@@ -7,6 +7,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import COORDINATOR_DECOS_KEY
 from .const import DOMAIN
 from .device import create_device_info
+from .entity import ChangeGatedEntity
 
 
 async def async_setup_entry(
@@ -20,7 +21,7 @@ async def async_setup_entry(
     async_add_entities([DecoPollingSwitch(coordinator)])
 
 
-class DecoPollingSwitch(SwitchEntity):
+class DecoPollingSwitch(ChangeGatedEntity, SwitchEntity):
     """Switch to control Deco polling."""
 
     def __init__(self, coordinator) -> None:
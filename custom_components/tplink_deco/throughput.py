@@ -0,0 +1,172 @@
+"""TP-Link Deco client throughput history."""
+
+from array import array
+from typing import Any
+
+THROUGHPUT_SAMPLES = 20
+THROUGHPUT_EWMA_WEIGHT = 0.3
+# A sample further than this from the previous one starts a new history, e.g.
+# when a client comes back, so speeds from before the gap are not integrated
+THROUGHPUT_MAX_GAP_SECONDS = 900
+
+# Each sample is stored as seconds since the previous sample, down and up speed
+_SAMPLE_WIDTH = 3
+
+
+class ThroughputHistory:
+    """
+    Last speed samples of a client in a fixed size ring buffer.
+
+    Samples are packed into a single float array so a client costs a few hundred
+    bytes however long it is tracked. The moving average is weighted by the
+    seconds each sample covers, since polls are not evenly spaced when the
+    update interval adapts or decos are queried in shards.
+    """
+
+    __slots__ = (
+        "size",
+        "count",
+        "last_timestamp",
+        "down_ewma",
+        "up_ewma",
+        "_samples",
+        "_index",
+        "_seconds_sum",
+        "_down_sum",
+        "_up_sum",
+    )
+
+    def __init__(self, size: int = THROUGHPUT_SAMPLES) -> None:
+        self.size = size
+        self._samples = array("f", bytes(4 * _SAMPLE_WIDTH * size))
+        self.clear()
+
+    def clear(self) -> None:
+        self.count = 0
+        self.last_timestamp = None
+        self.down_ewma = None
+        self.up_ewma = None
+        self._samples[:] = array("f", bytes(4 * _SAMPLE_WIDTH * self.size))
+        self._index = 0
+        self._seconds_sum = 0.0
+        self._down_sum = 0.0
+        self._up_sum = 0.0
+
+    def record(self, timestamp: float, down: float, up: float) -> tuple[float, float]:
+        """
+        Add a sample, replacing the oldest once the buffer is full.
+
+        Returns the kilobytes transferred down and up since the previous sample,
+        using the trapezoid rule on the two samples' speeds.
+        """
+        seconds = 0.0
+        if self.last_timestamp is not None:
+            seconds = max(0.0, timestamp - self.last_timestamp)
+            if seconds > THROUGHPUT_MAX_GAP_SECONDS:
+                self.clear()
+                seconds = 0.0
+        previous = self.last
+        transferred = (
+            (0.0, 0.0)
+            if previous is None
+            else ((previous[0] + down) / 2 * seconds, (previous[1] + up) / 2 * seconds)
+        )
+        self.last_timestamp = timestamp
+        if self.down_ewma is None:
+            self.down_ewma = down
+            self.up_ewma = up
+        else:
+            self.down_ewma += THROUGHPUT_EWMA_WEIGHT * (down - self.down_ewma)
+            self.up_ewma += THROUGHPUT_EWMA_WEIGHT * (up - self.up_ewma)
+
+        samples = self._samples
+        offset = self._index * _SAMPLE_WIDTH
+        old_seconds, old_down, old_up = samples[offset : offset + _SAMPLE_WIDTH]
+        samples[offset : offset + _SAMPLE_WIDTH] = array("f", (seconds, down, up))
+        # Use the stored values so the sums match what is removed later
+        seconds, down, up = samples[offset : offset + _SAMPLE_WIDTH]
+        self._seconds_sum += seconds - old_seconds
+        self._down_sum += down * seconds - old_down * old_seconds
+        self._up_sum += up * seconds - old_up * old_seconds
+
+        self.count = min(self.size, self.count + 1)
+        self._index = (self._index + 1) % self.size
+        if self._index == 0:
+            # Recompute the running sums once per cycle so rounding cannot build up
+            self._sum_samples()
+        return transferred
+
+    def _sum_samples(self) -> None:
+        samples = self._samples
+        weights = samples[0::_SAMPLE_WIDTH]
+        self._seconds_sum = sum(weights)
+        self._down_sum = sum(
+            seconds * down for seconds, down in zip(weights, samples[1::_SAMPLE_WIDTH])
+        )
+        self._up_sum = sum(
+            seconds * up for seconds, up in zip(weights, samples[2::_SAMPLE_WIDTH])
+        )
+
+    @property
+    def last(self) -> tuple[float, float] | None:
+        """Return the last down and up speeds."""
+        if self.count == 0:
+            return None
+        offset = (self._index - 1) % self.size * _SAMPLE_WIDTH
+        return self._samples[offset + 1], self._samples[offset + 2]
+
+    @property
+    def average(self) -> tuple[float, float] | None:
+        """Return the time weighted average down and up speeds."""
+        if self._seconds_sum <= 0:
+            return self.last
+        return (
+            self._down_sum / self._seconds_sum,
+            self._up_sum / self._seconds_sum,
+        )
+
+    @property
+    def peak(self) -> tuple[float, float] | None:
+        """Return the highest down and up speeds."""
+        if self.count == 0:
+            return None
+        # Speeds are never negative so unused samples do not affect the peak
+        return (
+            max(self._samples[1::_SAMPLE_WIDTH]),
+            max(self._samples[2::_SAMPLE_WIDTH]),
+        )
+
+    def get_samples(self) -> list[tuple[float, float, float]]:
+        """Return the timestamp, down and up speed of each sample, oldest first."""
+        samples = []
+        timestamp = self.last_timestamp
+        for i in range(1, self.count + 1):
+            offset = (self._index - i) % self.size * _SAMPLE_WIDTH
+            seconds, down, up = self._samples[offset : offset + _SAMPLE_WIDTH]
+            samples.append((timestamp, down, up))
+            timestamp -= seconds
+        samples.reverse()
+        return samples
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "samples": self.count,
+            "down_kilobytes_per_s_smoothed": self.down_ewma,
+            "up_kilobytes_per_s_smoothed": self.up_ewma,
+            "kilobytes_per_s_average": self.average,
+            "kilobytes_per_s_peak": self.peak,
+        }
+
+
+class TrafficCounter:
+    """Kilobytes transferred down and up."""
+
+    __slots__ = ("down_kilobytes", "up_kilobytes")
+
+    def __init__(self) -> None:
+        self.down_kilobytes = 0.0
+        self.up_kilobytes = 0.0
+
+    def add(self, down_kilobytes: float, up_kilobytes: float) -> None:
+        self.down_kilobytes += down_kilobytes
+        self.up_kilobytes += up_kilobytes
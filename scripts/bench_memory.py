@@ -0,0 +1,108 @@
+"""
+Benchmark memory used by clients.
+
+Builds clients from a decoded client list, like the client coordinator does,
+and reports the bytes still allocated per 1000 clients under tracemalloc. Each
+client is updated a few times so its throughput history fills up.
+
+Run from the repository root with the requirements installed:
+
+    python scripts/bench_memory.py
+"""
+
+import argparse
+from datetime import timedelta
+import gc
+import os
+import sys
+import tracemalloc
+
+from homeassistant.util import dt as dt_util
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.tplink_deco.coordinator import (  # noqa: E402
+    TpLinkDecoClient,
+)
+from custom_components.tplink_deco.throughput import (  # noqa: E402
+    ThroughputHistory,
+)
+
+DECO_MACS = ("00-00-00-00-00-00", "00-00-00-00-00-01", "00-00-00-00-00-02")
+
+
+def create_client_list(count: int) -> list[dict]:
+    """Return client list entries as decoded from the API."""
+    return [
+        {
+            "mac": f"11-22-33-{index >> 16 & 0xFF:02X}-{index >> 8 & 0xFF:02X}-"
+            f"{index & 0xFF:02X}",
+            "name": f"Client {index}",
+            "ip": f"192.168.{index >> 8 & 0xFF}.{index & 0xFF}",
+            "online": True,
+            "connection_type": "band5" if index % 2 else "band2_4",
+            "interface": "main",
+            "down_speed": index % 1000,
+            "up_speed": index % 100,
+        }
+        for index in range(count)
+    ]
+
+
+def create_clients(count: int, updates: int) -> dict[str, TpLinkDecoClient]:
+    """Return clients updated from client lists, like the client coordinator."""
+    clients = {}
+    now = dt_util.utcnow()
+    for update in range(updates):
+        client_list = create_client_list(count)
+        utc_point_in_time = now + timedelta(seconds=30 * update)
+        for index, data in enumerate(client_list):
+            client = clients.get(data["mac"])
+            if client is None:
+                client = clients[data["mac"]] = TpLinkDecoClient(data["mac"])
+            client.update(data, DECO_MACS[index % len(DECO_MACS)], utc_point_in_time)
+    return clients
+
+
+def measure(func, *args) -> int:
+    """Return the bytes still allocated by what func returns."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func(*args)
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return allocated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=5000, help="Clients to build")
+    parser.add_argument(
+        "--updates", type=int, default=25, help="Client list updates to apply"
+    )
+    args = parser.parse_args()
+
+    per_1k = 1000 / args.clients
+    results = {
+        "clients": measure(create_clients, args.clients, args.updates),
+        "restored clients": measure(
+            lambda: {
+                data["mac"]: TpLinkDecoClient(data["mac"])
+                for data in create_client_list(args.clients)
+            }
+        ),
+        "throughput history": measure(
+            lambda: [ThroughputHistory() for _ in range(args.clients)]
+        ),
+    }
+    for name, allocated in results.items():
+        sys.stdout.write(
+            f"{name:>18}: {allocated * per_1k / 1024:8.1f} KiB per 1k clients\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark RSA encryption of login payloads.
+
+Compares building the PKCS#1 v1.5 cipher on every call, as rsa_encrypt() did,
+with reusing an RsaEncryptor built once per public key. Both keys a Deco hands
+out are measured: the password key encrypts the password once per login, and
+the sign key encrypts the sign, about 90 bytes, on every request.
+
+Run from the repository root with the requirements installed:
+
+    python scripts/bench_rsa.py
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+from Crypto.Cipher import PKCS1_v1_5
+from Crypto.PublicKey import RSA
+from Crypto.Util.number import getPrime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.tplink_deco.api import (  # noqa: E402
+    PKCS1_v1_5_HEADER_BYTES,
+)
+from custom_components.tplink_deco.api import RsaEncryptor  # noqa: E402
+from custom_components.tplink_deco.api import byte_len  # noqa: E402
+
+
+def rsa_encrypt_per_call(n: int, e: int, plaintext: bytes) -> str:
+    """RSA encrypt plaintext, building the cipher for this call only."""
+    encryptor = PKCS1_v1_5.new(RSA.construct((n, e)).publickey())
+    block_size = byte_len(n)
+    bytes_per_block = block_size - PKCS1_v1_5_HEADER_BYTES
+    encrypted = ""
+    for index in range(0, len(plaintext), bytes_per_block):
+        encrypted += encryptor.encrypt(plaintext[index : index + bytes_per_block]).hex()
+    return encrypted
+
+
+def benchmark(name: str, bits: int, plaintext_bytes: int, args) -> None:
+    """Write the time per call to encrypt plaintext_bytes with a new bits key."""
+    # RSA.generate() refuses keys under 1024 bits, and only the public key is used
+    n, e = getPrime(bits // 2) * getPrime(bits - bits // 2), 65537
+    plaintext = os.urandom(plaintext_bytes)
+    encryptor = RsaEncryptor(n, e)
+
+    results = {
+        "per call": lambda: rsa_encrypt_per_call(n, e, plaintext),
+        "cached": lambda: encryptor.encrypt(plaintext),
+    }
+    best = {}
+    sys.stdout.write(f"{name} key, {bits} bits, {plaintext_bytes} bytes:\n")
+    for result, func in results.items():
+        best[result] = (
+            min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+            / args.number
+        )
+        sys.stdout.write(f"{result:>10}: {best[result] * 1e6:8.1f} us/call\n")
+    sys.stdout.write(f"   speedup: {best['per call'] / best['cached']:8.2f}x\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--password-bits", type=int, default=1024, help="Password key size"
+    )
+    parser.add_argument(
+        "--password-bytes", type=int, default=16, help="Password length"
+    )
+    parser.add_argument("--sign-bits", type=int, default=512, help="Sign key size")
+    parser.add_argument("--sign-bytes", type=int, default=90, help="Sign length")
+    parser.add_argument("--number", type=int, default=2000, help="Calls per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs, best is shown")
+    args = parser.parse_args()
+
+    benchmark("Password", args.password_bits, args.password_bytes, args)
+    benchmark("Sign", args.sign_bits, args.sign_bytes, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Tests for TP-Link Deco."""
@@ -0,0 +1,49 @@
+"""Fixtures for TP-Link Deco tests."""
+
+from collections.abc import AsyncGenerator
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from custom_components.tplink_deco.api import TplinkDecoApi
+
+from .fake_deco import PASSWORD
+from .fake_deco import FakeDeco
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable loading the integration."""
+    yield
+
+
+@pytest.fixture(autouse=True)
+def threaded_resolver():
+    """Resolve with threads, closing the aiodns resolver leaves a thread behind."""
+    with patch("aiohttp.connector.DefaultResolver", aiohttp.ThreadedResolver):
+        yield
+
+
+@pytest.fixture
+async def fake_deco(socket_enabled) -> AsyncGenerator[FakeDeco]:
+    """Return a fake Deco with a single deco, served on localhost."""
+    deco = FakeDeco()
+    await deco.async_start()
+    yield deco
+    await deco.async_stop()
+
+
+@pytest.fixture
+async def make_api(fake_deco: FakeDeco):
+    """Return a function creating APIs for fake_deco, closed after the test."""
+    apis = []
+
+    def _make_api(**kwargs) -> TplinkDecoApi:
+        api = TplinkDecoApi(fake_deco.host, "admin", PASSWORD, False, **kwargs)
+        apis.append(api)
+        return api
+
+    yield _make_api
+    for api in apis:
+        await api.async_close()
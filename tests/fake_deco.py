@@ -0,0 +1,173 @@
+"""Fake TP-Link Deco router speaking the encrypted web API."""
+
+import asyncio
+import base64
+import json
+import re
+from typing import Any
+from urllib.parse import parse_qs
+
+from Crypto.Cipher import AES
+from Crypto.Cipher import PKCS1_v1_5
+from Crypto.PublicKey import RSA
+from Crypto.Util.Padding import pad
+from Crypto.Util.Padding import unpad
+from aiohttp import web
+
+PASSWORD = "password"
+STOK_PATTERN = re.compile(r";stok=([^/]*)/")
+
+
+def encode_name(name: str) -> str:
+    return base64.b64encode(name.encode()).decode()
+
+
+def rsa_decrypt(key: RSA.RsaKey, ciphertext_hex: str) -> bytes:
+    cipher = PKCS1_v1_5.new(key)
+    block_size = key.size_in_bytes()
+    ciphertext = bytes.fromhex(ciphertext_hex)
+    return b"".join(
+        cipher.decrypt(ciphertext[index : index + block_size], None)
+        for index in range(0, len(ciphertext), block_size)
+    )
+
+
+class FakeDeco:
+    """
+    A Deco mesh served on localhost.
+
+    Responses to a form, or to a client list of one deco as ("client_list",
+    deco_mac), can be delayed with delays. Every request is recorded in requests
+    as (form, params).
+    """
+
+    def __init__(self, deco_macs: tuple[str, ...] = ("D0",)) -> None:
+        self.password_key = RSA.generate(1024)
+        self.sign_key = RSA.generate(1024)
+        self.seq = 100
+        self.stok = "stok0"
+        self.logins = 0
+        self.set_decos(deco_macs)
+        self.delays: dict[Any, float] = {}
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+        self.host = None
+        self._aes_key = None
+        self._runner = None
+
+    def set_decos(self, deco_macs: tuple[str, ...]) -> None:
+        """Replace the mesh with decos without clients, the first is the master."""
+        self.devices = [
+            {
+                "mac": mac,
+                "role": "master" if index == 0 else "slave",
+                "nickname": f"deco_{index}",
+                "group_status": "connected",
+            }
+            for index, mac in enumerate(deco_macs)
+        ]
+        # Clients connected to each deco
+        self.clients: dict[str, list[dict[str, Any]]] = {mac: [] for mac in deco_macs}
+
+    def add_client(self, deco_mac: str, mac: str, **data) -> None:
+        self.clients[deco_mac].append(
+            {"mac": mac, "name": encode_name(mac), "online": True, **data}
+        )
+
+    def rotate_password_key(self) -> None:
+        """Generate a new password key, like a Deco does when it reboots."""
+        self.password_key = RSA.generate(1024)
+
+    async def async_start(self) -> str:
+        app = web.Application()
+        app.router.add_route("POST", "/{tail:.*}", self._async_handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.host = f"http://127.0.0.1:{port}"
+        return self.host
+
+    async def async_stop(self) -> None:
+        await self._runner.cleanup()
+
+    def _decrypt_request(self, body: str) -> dict[str, Any]:
+        fields = parse_qs(body)
+        sign = dict(
+            item.split("=", 1)
+            for item in rsa_decrypt(self.sign_key, fields["sign"][0])
+            .decode()
+            .split("&")
+        )
+        self._aes_key = (sign["k"].encode(), sign["i"].encode())
+        cipher = AES.new(self._aes_key[0], AES.MODE_CBC, self._aes_key[1])
+        plaintext = unpad(
+            cipher.decrypt(base64.b64decode(fields["data"][0])), AES.block_size
+        )
+        return json.loads(plaintext)
+
+    def _encrypt_response(self, inner: dict[str, Any]) -> web.Response:
+        cipher = AES.new(self._aes_key[0], AES.MODE_CBC, self._aes_key[1])
+        data = base64.b64encode(
+            cipher.encrypt(pad(json.dumps(inner).encode(), AES.block_size))
+        ).decode()
+        return web.Response(
+            text=json.dumps({"error_code": 0, "data": data}),
+            headers={"Set-Cookie": "sysauth=0123abcd; path=/"},
+        )
+
+    async def _async_handle(self, request: web.Request) -> web.Response:
+        form = request.query.get("form")
+        body = await request.text()
+        if form in ("keys", "auth"):
+            self.requests.append((form, {}))
+            key = self.password_key if form == "keys" else self.sign_key
+            key_hex = [format(key.n, "x"), format(key.e, "x")]
+            result = (
+                {"password": key_hex}
+                if form == "keys"
+                else {"key": key_hex, "seq": self.seq}
+            )
+            return web.json_response({"error_code": 0, "result": result})
+
+        payload = self._decrypt_request(body)
+        params = payload.get("params", {})
+        self.requests.append((form, params))
+        delay = self.delays.get((form, params.get("device_mac")), 0) or self.delays.get(
+            form, 0
+        )
+        if delay:
+            await asyncio.sleep(delay)
+
+        if form == "login":
+            try:
+                password = rsa_decrypt(self.password_key, params["password"]).decode()
+            except (ValueError, UnicodeDecodeError):
+                password = None
+            if password != PASSWORD:
+                return self._encrypt_response(
+                    {"error_code": -5002, "result": {"attemptsAllowed": 9}}
+                )
+            self.logins += 1
+            self.stok = f"stok{self.logins}"
+            return self._encrypt_response(
+                {"error_code": 0, "result": {"stok": self.stok}}
+            )
+
+        match = STOK_PATTERN.search(request.path)
+        if match is None or match.group(1) != self.stok:
+            return web.Response(status=403)
+        if form == "device_list":
+            result = {"device_list": self.devices}
+        elif form == "client_list":
+            deco_mac = params.get("device_mac", "default")
+            if deco_mac == "default":
+                client_list = [
+                    client for clients in self.clients.values() for client in clients
+                ]
+            else:
+                client_list = self.clients[deco_mac]
+            result = {"client_list": client_list}
+        else:
+            result = {}
+        return self._encrypt_response({"error_code": 0, "result": result})
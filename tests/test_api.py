@@ -0,0 +1,81 @@
+"""Tests for the TP-Link Deco API."""
+
+import pytest
+
+from custom_components.tplink_deco.api import JsonArrayStream
+from custom_components.tplink_deco.api import TplinkDecoApi
+from custom_components.tplink_deco.exceptions import LoginInvalidException
+from custom_components.tplink_deco.exceptions import TimeoutException
+
+from .fake_deco import FakeDeco
+
+
+def count_requests(fake_deco: FakeDeco, form: str) -> int:
+    return sum(1 for request_form, _ in fake_deco.requests if request_form == form)
+
+
+async def test_login_refetches_stale_cached_password_key(
+    fake_deco: FakeDeco, make_api
+) -> None:
+    api = make_api()
+    await api.async_login()
+    assert count_requests(fake_deco, "keys") == 1
+
+    # Rebooting the Deco ends the session and generates a new password key
+    fake_deco.rotate_password_key()
+    fake_deco.stok = "rebooted"
+
+    devices = await api.async_list_devices()
+
+    assert [device["mac"] for device in devices] == ["D0"]
+    assert count_requests(fake_deco, "keys") == 2
+    assert fake_deco.logins == 2
+
+
+async def test_login_with_wrong_password_raises(fake_deco: FakeDeco) -> None:
+    api = TplinkDecoApi(fake_deco.host, "admin", "wrong", False)
+    try:
+        with pytest.raises(LoginInvalidException):
+            await api.async_login()
+    finally:
+        await api.async_close()
+
+    # A freshly fetched key is not retried
+    assert count_requests(fake_deco, "keys") == 1
+    assert count_requests(fake_deco, "login") == 1
+
+
+def test_json_array_stream_waits_for_item_terminators() -> None:
+    items = []
+    stream = JsonArrayStream("list", items.append)
+    document = b'{"list": [12345, 678 , {"a": [1]}, true, -1.5e3], "n": 2}'
+
+    for index in range(len(document)):
+        stream.feed(document[index : index + 1])
+
+    assert items == [12345, 678, {"a": [1]}, True, -1500.0]
+    assert stream.close() == {"list": [], "n": 2}
+
+
+async def test_hedged_request_timing_out_counts_one_failure(
+    fake_deco: FakeDeco, make_api
+) -> None:
+    api = make_api(timeout_error_retries=0, timeout_seconds=0.5, hedge_requests=True)
+    # Enough samples for a p99 latency, so requests are hedged
+    for _ in range(5):
+        await api.async_list_devices()
+    fake_deco.delays["device_list"] = 1
+
+    with pytest.raises(TimeoutException):
+        await api.async_list_devices()
+
+    assert count_requests(fake_deco, "device_list") == 7
+    assert api._circuit_breaker.consecutive_failures == 1
+
+
+async def test_connection_limit_leaves_room_for_hedged_requests(make_api) -> None:
+    api = make_api(max_concurrent_requests=3)
+    hedging_api = make_api(max_concurrent_requests=3, hedge_requests=True)
+
+    assert api._get_session().connector.limit_per_host == 4
+    assert hedging_api._get_session().connector.limit_per_host == 6
@@ -0,0 +1,28 @@
+"""Tests for the TP-Link Deco circuit breaker."""
+
+from unittest.mock import patch
+
+from custom_components.tplink_deco.circuit_breaker import STATE_HALF_OPEN
+from custom_components.tplink_deco.circuit_breaker import STATE_OPEN
+from custom_components.tplink_deco.circuit_breaker import CircuitBreaker
+
+
+def test_only_failed_probes_back_off() -> None:
+    breaker = CircuitBreaker(failure_threshold=1)
+    with patch("random.uniform", return_value=0):
+        breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+        retry_seconds = breaker.get_retry_seconds()
+
+        # In-flight requests failing while open are not probes
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.get_retry_seconds() <= retry_seconds
+
+        with patch("time.monotonic", return_value=breaker._next_probe_at):
+            assert breaker.allow_request()
+            assert breaker.state == STATE_HALF_OPEN
+            breaker.record_failure()
+            assert breaker.state == STATE_OPEN
+            # Equal jitter of 0 keeps half of the doubled backoff
+            assert breaker.get_retry_seconds() == breaker.backoff_base_seconds
@@ -0,0 +1,116 @@
+"""Tests for the TP-Link Deco coordinators."""
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.tplink_deco.circuit_breaker import STATE_CLOSED
+from custom_components.tplink_deco.client_query import STRATEGY_GLOBAL
+from custom_components.tplink_deco.coordinator import TplinkDecoClientUpdateCoordinator
+from custom_components.tplink_deco.coordinator import TplinkDecoUpdateCoordinator
+
+from .fake_deco import FakeDeco
+
+DECO_MACS = ("D0", "D1", "D2")
+
+
+async def async_create_coordinators(hass: HomeAssistant, api, **kwargs):
+    deco_coordinator = TplinkDecoUpdateCoordinator(hass, api, None)
+    await deco_coordinator.async_refresh()
+    assert deco_coordinator.last_update_success
+    clients_coordinator = TplinkDecoClientUpdateCoordinator(
+        hass, api, None, deco_coordinator, 180, **kwargs
+    )
+    return deco_coordinator, clients_coordinator
+
+
+def count_per_deco_queries(fake_deco: FakeDeco) -> int:
+    return sum(
+        1
+        for form, params in fake_deco.requests
+        if form == "client_list" and params.get("device_mac") in DECO_MACS
+    )
+
+
+async def test_mesh_falls_back_to_global_query_when_per_deco_queries_time_out(
+    hass: HomeAssistant, fake_deco: FakeDeco, make_api
+) -> None:
+    fake_deco.set_decos(DECO_MACS)
+    for index, deco_mac in enumerate(DECO_MACS):
+        fake_deco.add_client(deco_mac, f"C{index}")
+        fake_deco.delays[("client_list", deco_mac)] = 1
+    api = make_api(timeout_seconds=0.2)
+    _, clients_coordinator = await async_create_coordinators(hass, api)
+
+    await clients_coordinator.async_refresh()
+
+    assert clients_coordinator.last_update_success
+    assert set(clients_coordinator.data) == {"C0", "C1", "C2"}
+    assert count_per_deco_queries(fake_deco) == len(DECO_MACS)
+    # Per-deco timeouts must not open the circuit for the fallback
+    assert api._circuit_breaker.state == STATE_CLOSED
+    assert api._circuit_breaker.consecutive_failures == 0
+
+    # Later refreshes skip straight to the global query
+    for _ in range(3):
+        await clients_coordinator.async_refresh()
+        assert clients_coordinator.last_update_success
+    assert clients_coordinator.client_query_cost_model.current == STRATEGY_GLOBAL
+    assert count_per_deco_queries(fake_deco) == len(DECO_MACS)
+    assert api._circuit_breaker.state == STATE_CLOSED
+
+
+async def test_mesh_lists_clients_per_deco(
+    hass: HomeAssistant, fake_deco: FakeDeco, make_api
+) -> None:
+    fake_deco.set_decos(DECO_MACS)
+    for index, deco_mac in enumerate(DECO_MACS):
+        fake_deco.add_client(deco_mac, f"C{index}")
+    api = make_api()
+    _, clients_coordinator = await async_create_coordinators(hass, api)
+
+    for _ in range(3):
+        await clients_coordinator.async_refresh()
+
+    assert {
+        mac: client.deco_mac for mac, client in clients_coordinator.data.items()
+    } == {
+        "C0": "D0",
+        "C1": "D1",
+        "C2": "D2",
+    }
+    assert clients_coordinator.client_query_cost_model.current != STRATEGY_GLOBAL
+
+
+async def test_per_deco_query_time_excludes_waiting_for_a_slot(
+    hass: HomeAssistant, fake_deco: FakeDeco, make_api
+) -> None:
+    fake_deco.set_decos(DECO_MACS)
+    for deco_mac in DECO_MACS:
+        fake_deco.delays[("client_list", deco_mac)] = 0.2
+    api = make_api(max_concurrent_requests=1)
+    _, clients_coordinator = await async_create_coordinators(hass, api)
+
+    await clients_coordinator.async_refresh()
+
+    assert clients_coordinator.last_update_success
+    assert set(clients_coordinator.deco_client_list_seconds) == set(DECO_MACS)
+    # Queries run one at a time, the last one waited for the other two
+    for seconds in clients_coordinator.deco_client_list_seconds.values():
+        assert 0.2 <= seconds < 0.4
+
+
+async def test_client_speed_average_is_not_a_change(
+    hass: HomeAssistant, fake_deco: FakeDeco, make_api
+) -> None:
+    fake_deco.add_client("D0", "C0", down_speed=800)
+    _, clients_coordinator = await async_create_coordinators(hass, make_api())
+    await clients_coordinator.async_refresh()
+    await clients_coordinator.async_refresh()
+    fake_deco.clients["D0"][0]["down_speed"] = 0
+    await clients_coordinator.async_refresh()
+    average = clients_coordinator.data["C0"].down_kilobytes_per_s_average
+
+    # The average keeps falling while the client stays idle
+    await clients_coordinator.async_refresh()
+
+    assert clients_coordinator.data["C0"].down_kilobytes_per_s_average < average
+    assert "C0" not in clients_coordinator.changes.macs
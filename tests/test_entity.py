@@ -0,0 +1,63 @@
+"""Tests for TP-Link Deco entities."""
+
+from homeassistant.const import ATTR_FRIENDLY_NAME
+from homeassistant.const import STATE_OFF
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry
+from homeassistant.helpers import entity_registry
+
+from custom_components.tplink_deco.const import COORDINATOR_DECOS_KEY
+from custom_components.tplink_deco.const import DOMAIN
+
+from .fake_deco import FakeDeco
+from .test_init import create_config_entry
+
+DECO_ONLINE_ENTITY_ID = "binary_sensor.deco_0_deco_deco_online"
+
+
+async def test_device_rename_updates_friendly_name(
+    hass: HomeAssistant, fake_deco: FakeDeco
+) -> None:
+    config_entry = create_config_entry(hass, fake_deco)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert (
+        hass.states.get(DECO_ONLINE_ENTITY_ID).attributes[ATTR_FRIENDLY_NAME]
+        == "Deco 0 Deco Deco online"
+    )
+
+    entry = entity_registry.async_get(hass).async_get(DECO_ONLINE_ENTITY_ID)
+    device_registry.async_get(hass).async_update_device(
+        entry.device_id, name_by_user="Hallway"
+    )
+    await hass.async_block_till_done()
+
+    assert (
+        hass.states.get(DECO_ONLINE_ENTITY_ID).attributes[ATTR_FRIENDLY_NAME]
+        == "Hallway Deco online"
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_unchanged_state_is_not_written(
+    hass: HomeAssistant, fake_deco: FakeDeco
+) -> None:
+    config_entry = create_config_entry(hass, fake_deco)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    deco_coordinator = hass.data[DOMAIN][config_entry.entry_id][COORDINATOR_DECOS_KEY]
+    state = hass.states.get(DECO_ONLINE_ENTITY_ID)
+
+    await deco_coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(DECO_ONLINE_ENTITY_ID).last_reported == state.last_reported
+
+    fake_deco.devices[0]["group_status"] = "disconnected"
+    await deco_coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(DECO_ONLINE_ENTITY_ID).state == STATE_OFF
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,132 @@
+"""Tests for setting up TP-Link Deco."""
+
+from datetime import timedelta
+
+from homeassistant.const import CONF_HOST
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.const import CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.core import State
+from homeassistant.helpers import entity_registry
+import homeassistant.util.dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import mock_restore_cache
+
+from custom_components.tplink_deco.const import ATTR_DEVICE_TYPE
+from custom_components.tplink_deco.const import CLIENTS_STORAGE_KEY
+from custom_components.tplink_deco.const import CLIENTS_STORAGE_VERSION
+from custom_components.tplink_deco.const import CONF_CLIENT_POSTFIX
+from custom_components.tplink_deco.const import CONF_CLIENT_PREFIX
+from custom_components.tplink_deco.const import CONF_CLIENT_RETENTION_DAYS
+from custom_components.tplink_deco.const import CONF_DECO_POSTFIX
+from custom_components.tplink_deco.const import CONF_DECO_PREFIX
+from custom_components.tplink_deco.const import CONF_TIMEOUT_ERROR_RETRIES
+from custom_components.tplink_deco.const import CONF_TIMEOUT_SECONDS
+from custom_components.tplink_deco.const import CONF_VERIFY_SSL
+from custom_components.tplink_deco.const import COORDINATOR_CLIENTS_KEY
+from custom_components.tplink_deco.const import DEFAULT_DECO_POSTFIX
+from custom_components.tplink_deco.const import DEVICE_TYPE_CLIENT
+from custom_components.tplink_deco.const import DOMAIN
+
+from .fake_deco import PASSWORD
+from .fake_deco import FakeDeco
+
+
+def create_config_entry(hass: HomeAssistant, fake_deco: FakeDeco, **data):
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=6,
+        data={
+            CONF_HOST: fake_deco.host,
+            CONF_USERNAME: "admin",
+            CONF_PASSWORD: PASSWORD,
+            CONF_VERIFY_SSL: False,
+            CONF_TIMEOUT_ERROR_RETRIES: 1,
+            CONF_TIMEOUT_SECONDS: 5,
+            CONF_CLIENT_PREFIX: "",
+            CONF_CLIENT_POSTFIX: "",
+            CONF_DECO_PREFIX: "",
+            CONF_DECO_POSTFIX: DEFAULT_DECO_POSTFIX,
+            **data,
+        },
+    )
+    config_entry.add_to_hass(hass)
+    return config_entry
+
+
+def restore_client(
+    hass: HomeAssistant, config_entry: MockConfigEntry, mac: str
+) -> entity_registry.RegistryEntry:
+    entry = entity_registry.async_get(hass).async_get_or_create(
+        "device_tracker",
+        DOMAIN,
+        mac,
+        config_entry=config_entry,
+        original_name=mac,
+    )
+    mock_restore_cache(
+        hass,
+        [State(entry.entity_id, "not_home", {ATTR_DEVICE_TYPE: DEVICE_TYPE_CLIENT})],
+    )
+    return entry
+
+
+async def test_client_unseen_for_retention_days_is_removed_after_restart(
+    hass: HomeAssistant, hass_storage, fake_deco: FakeDeco
+) -> None:
+    fake_deco.add_client("D0", "NEW")
+    config_entry = create_config_entry(
+        hass, fake_deco, **{CONF_CLIENT_RETENTION_DAYS: 7}
+    )
+    entry = restore_client(hass, config_entry, "OLD")
+    hass_storage[CLIENTS_STORAGE_KEY.format(entry_id=config_entry.entry_id)] = {
+        "version": CLIENTS_STORAGE_VERSION,
+        "key": CLIENTS_STORAGE_KEY.format(entry_id=config_entry.entry_id),
+        "data": {
+            "last_seen": {"OLD": (dt_util.utcnow() - timedelta(days=30)).isoformat()}
+        },
+    }
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    clients_coordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR_CLIENTS_KEY
+    ]
+    assert set(clients_coordinator.data) == {"NEW"}
+    assert entity_registry.async_get(hass).async_get(entry.entity_id) is None
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_client_seen_within_retention_days_is_kept_after_restart(
+    hass: HomeAssistant, hass_storage, fake_deco: FakeDeco
+) -> None:
+    config_entry = create_config_entry(
+        hass, fake_deco, **{CONF_CLIENT_RETENTION_DAYS: 7}
+    )
+    restore_client(hass, config_entry, "RECENT")
+    hass_storage[CLIENTS_STORAGE_KEY.format(entry_id=config_entry.entry_id)] = {
+        "version": CLIENTS_STORAGE_VERSION,
+        "key": CLIENTS_STORAGE_KEY.format(entry_id=config_entry.entry_id),
+        "data": {
+            "last_seen": {"RECENT": (dt_util.utcnow() - timedelta(days=2)).isoformat()}
+        },
+    }
+
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    clients_coordinator = hass.data[DOMAIN][config_entry.entry_id][
+        COORDINATOR_CLIENTS_KEY
+    ]
+    assert set(clients_coordinator.data) == {"RECENT"}
+    assert clients_coordinator.export_last_seen()["RECENT"] == (
+        hass_storage[CLIENTS_STORAGE_KEY.format(entry_id=config_entry.entry_id)][
+            "data"
+        ]["last_seen"]["RECENT"]
+    )
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
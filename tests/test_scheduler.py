@@ -0,0 +1,85 @@
+"""Tests for the TP-Link Deco request scheduler."""
+
+import asyncio
+
+from custom_components.tplink_deco.scheduler import PRIORITY_INTERACTIVE
+from custom_components.tplink_deco.scheduler import PRIORITY_PRESENCE
+from custom_components.tplink_deco.scheduler import PRIORITY_RENEWAL
+from custom_components.tplink_deco.scheduler import RequestScheduler
+
+
+async def async_run_requests(scheduler: RequestScheduler, requests) -> list[str]:
+    """Queue (name, priority, endpoint) requests in order and return start order."""
+    started = []
+    release = asyncio.Event()
+
+    async def async_request(name: str, priority: int, endpoint: str) -> None:
+        async with scheduler.async_slot(priority, endpoint):
+            started.append(name)
+            await release.wait()
+
+    tasks = []
+    for request in requests:
+        tasks.append(asyncio.create_task(async_request(*request)))
+        # Let the request queue before the next one
+        await asyncio.sleep(0)
+    while not all(task.done() for task in tasks):
+        release.set()
+        release.clear()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return started
+
+
+async def test_blocked_higher_priority_request_is_not_starved() -> None:
+    scheduler = RequestScheduler(1, {"client_list": 3})
+
+    started = await async_run_requests(
+        scheduler,
+        [
+            ("c1", PRIORITY_PRESENCE, "client_list"),
+            ("reboot", PRIORITY_INTERACTIVE, "reboot"),
+            *((f"c{i}", PRIORITY_PRESENCE, "client_list") for i in range(2, 6)),
+        ],
+    )
+
+    assert started == ["c1", "reboot", "c2", "c3", "c4", "c5"]
+
+
+async def test_endpoint_concurrency_runs_alongside_its_own_requests() -> None:
+    scheduler = RequestScheduler(1, {"client_list": 3})
+    running = []
+    peak = 0
+
+    async def async_request(endpoint: str) -> None:
+        nonlocal peak
+        async with scheduler.async_slot(PRIORITY_PRESENCE, endpoint):
+            running.append(endpoint)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.01)
+            running.remove(endpoint)
+
+    await asyncio.gather(*(async_request("client_list") for _ in range(3)))
+    assert peak == 3
+
+    peak = 0
+    await asyncio.gather(async_request("client_list"), async_request("device_list"))
+    assert peak == 1
+
+
+async def test_exclusive_endpoint_waits_for_running_requests() -> None:
+    scheduler = RequestScheduler(
+        1, {"client_list": 3}, exclusive_endpoints=frozenset({"login"})
+    )
+
+    started = await async_run_requests(
+        scheduler,
+        [
+            ("c1", PRIORITY_PRESENCE, "client_list"),
+            ("c2", PRIORITY_PRESENCE, "client_list"),
+            ("login", PRIORITY_RENEWAL, "login"),
+            ("c3", PRIORITY_PRESENCE, "client_list"),
+        ],
+    )
+
+    assert started == ["c1", "c2", "c3", "login"]